@@ -0,0 +1,88 @@
+"""
+Current announcement bar, held in memory.
+
+The announcement bar is rendered on every public page. Instead of a dated
+query per page load, every active announcement that hasn't ended is loaded
+once (reloaded through the invalidation bus on writes) and the current one
+is picked in memory. A timer re-picks at the next start_date/end_date
+boundary, so scheduled announcements switch on and off on time without
+touching the database.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from cache import CachedResponse, prepare_response
+
+logger = logging.getLogger(__name__)
+
+
+class CurrentAnnouncement:
+    """Pre-serialized current announcement, recomputed on reload and at schedule boundaries"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.response: CachedResponse = prepare_response(None)
+        self.current: Optional[dict] = None
+        self.next_boundary: Optional[datetime] = None
+        self._candidates: List[dict] = []
+        self._boundary_task: Optional[asyncio.Task] = None
+
+    async def reload(self) -> None:
+        """Reload active, not yet ended announcements and re-pick the current one"""
+        self._candidates = await self.collection.find(
+            {"status": "active", "end_date": {"$gte": datetime.utcnow()}},
+            {"_id": 0}
+        ).sort("created_at", -1).to_list(100)
+        self._select()
+
+    def _select(self) -> None:
+        now = datetime.utcnow()
+        # Same rule as the old query: newest active announcement whose window contains now
+        current = next(
+            (a for a in self._candidates if a["start_date"] <= now <= a["end_date"]),
+            None
+        )
+        self.current = current
+        self.response = prepare_response(current)
+
+        # end_date is inclusive, so the announcement goes away just after it
+        boundaries = [a["start_date"] for a in self._candidates if a["start_date"] > now]
+        boundaries += [a["end_date"] + timedelta(milliseconds=1) for a in self._candidates if a["end_date"] >= now]
+        self.next_boundary = min(boundaries) if boundaries else None
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if self._boundary_task and not self._boundary_task.done():
+            self._boundary_task.cancel()
+        self._boundary_task = None
+        if self.next_boundary is not None:
+            self._boundary_task = asyncio.create_task(self._wait_for_boundary(self.next_boundary))
+
+    async def _wait_for_boundary(self, boundary: datetime) -> None:
+        delay = (boundary - datetime.utcnow()).total_seconds()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Don't let the task cancel itself from inside _schedule
+        self._boundary_task = None
+        self._select()
+
+    async def on_change(self, key=None) -> None:
+        """Invalidation bus callback"""
+        await self.reload()
+
+    async def start(self) -> None:
+        try:
+            await self.reload()
+        except Exception as e:
+            logger.error(f"Announcement load failed: {e}")
+
+    async def stop(self) -> None:
+        if self._boundary_task:
+            self._boundary_task.cancel()
+            try:
+                await self._boundary_task
+            except asyncio.CancelledError:
+                pass
+            self._boundary_task = None
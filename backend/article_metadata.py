@@ -0,0 +1,78 @@
+"""
+Article text metadata (reading time, word count, excerpt), computed once at write time.
+
+Run directly to backfill existing articles (--force recomputes all):
+    python article_metadata.py
+"""
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+import re
+import sys
+
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 200
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def plain_text(body: str) -> str:
+    """Strip HTML tags and collapse whitespace"""
+    if not body:
+        return ""
+    return _WHITESPACE_RE.sub(" ", _TAG_RE.sub(" ", body)).strip()
+
+
+def make_excerpt(text: str, length: int = EXCERPT_LENGTH) -> str:
+    """Cut plain text to a word boundary no longer than length"""
+    if len(text) <= length:
+        return text
+    cut = text[:length].rsplit(" ", 1)[0]
+    return cut.rstrip(".,;:") + "…"
+
+
+def build_article_metadata(body: str) -> dict:
+    """Compute the stored text metadata for an article body"""
+    text = plain_text(body)
+    word_count = len(text.split())
+    return {
+        "word_count": word_count,
+        # Estimated reading time in minutes (based on ~200 words per minute)
+        "read_time_minutes": max(1, round(word_count / WORDS_PER_MINUTE)),
+        "excerpt": make_excerpt(text),
+    }
+
+
+async def backfill_article_metadata(articles_collection, force: bool = False) -> int:
+    """Store metadata on articles that are missing it. Returns number updated."""
+    query = {} if force else {"$or": [
+        {"read_time_minutes": {"$exists": False}},
+        {"word_count": {"$exists": False}},
+        {"excerpt": {"$exists": False}},
+    ]}
+
+    updated = 0
+    async for article in articles_collection.find(query, {"_id": 0, "id": 1, "body": 1}):
+        await articles_collection.update_one(
+            {"id": article["id"]},
+            {"$set": build_article_metadata(article.get("body", ""))}
+        )
+        updated += 1
+    return updated
+
+
+async def main():
+    # Connect to MongoDB
+    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[os.environ.get('DB_NAME', 'student_signal')]
+
+    updated = await backfill_article_metadata(db.articles, force="--force" in sys.argv)
+    print(f"✅ Backfilled metadata for {updated} articles")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
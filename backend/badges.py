@@ -0,0 +1,157 @@
+"""
+User badges, evaluated when the data behind them changes.
+
+Every rule is registered once below with the user fields it reads and the
+events that can change its outcome. Write paths call evaluate_badges() with
+their event; only the rules listening for it are re-checked, and the user's
+stored badges are written back only if they changed. Reading badges is a
+plain field read.
+
+Each user is stamped with the BADGE_RULES_VERSION their badges were last
+fully computed under. Startup recomputes only users with another stamp, so
+a deploy that adds or changes a rule backfills itself.
+
+    python badges.py    # recompute every user's badges
+"""
+import asyncio
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Callable, FrozenSet, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+# Events raised by the write paths
+PROFILE_UPDATED = "profile_updated"
+ONBOARDING_COMPLETED = "onboarding_completed"
+COLLEGE_SAVED = "college_saved"
+COLLEGE_UNSAVED = "college_unsaved"
+COLLEGE_STATUS_CHANGED = "college_status_changed"
+
+
+@dataclass(frozen=True)
+class BadgeRule:
+    name: str
+    fields: Tuple[str, ...]
+    events: FrozenSet[str]
+    check: Callable[[dict], bool]
+
+
+BADGE_RULES: List[BadgeRule] = []
+
+
+def badge_rule(name: str, fields: Tuple[str, ...], events: Tuple[str, ...]):
+    """Register check(user) -> bool as the rule for a badge; order here is display order"""
+    def register(check: Callable[[dict], bool]):
+        BADGE_RULES.append(BadgeRule(name, fields, frozenset(events), check))
+        return check
+    return register
+
+
+PROFILE_COMPLETE_FIELDS = ("first_name", "last_name", "email", "high_school_grad_year", "intended_major", "gpa")
+
+
+@badge_rule("Profile Complete", PROFILE_COMPLETE_FIELDS, (PROFILE_UPDATED, ONBOARDING_COMPLETED))
+def profile_complete(user: dict) -> bool:
+    return all(user.get(field) for field in PROFILE_COMPLETE_FIELDS)
+
+
+@badge_rule("Photo Uploaded", ("profile_picture_url",), (PROFILE_UPDATED,))
+def photo_uploaded(user: dict) -> bool:
+    return bool(user.get("profile_picture_url"))
+
+
+@badge_rule("First Application", ("saved_colleges",), (COLLEGE_SAVED, COLLEGE_UNSAVED))
+def first_application(user: dict) -> bool:
+    # Awarded for any saved college until application statuses are tracked per college
+    return bool(user.get("saved_colleges"))
+
+
+def rules_version(rules: List[BadgeRule]) -> str:
+    """Fingerprint of the rule set; changes when a rule is added, removed or edited"""
+    digest = hashlib.sha1()
+    for rule in rules:
+        code = rule.check.__code__
+        # Bytecode and constants stand in for the rule's logic (a Python upgrade
+        # changes them too, which only costs one extra recompute)
+        signature = (rule.name, rule.fields, sorted(rule.events), code.co_code, code.co_consts)
+        digest.update(repr(signature).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+BADGE_RULES_VERSION = rules_version(BADGE_RULES)
+
+
+def apply_rules(user: dict, rules: List[BadgeRule]) -> List[str]:
+    """User's badge list with the given rules re-checked, in registry order"""
+    badges = set(user.get("badges") or [])
+    for rule in rules:
+        if rule.check(user):
+            badges.add(rule.name)
+        else:
+            badges.discard(rule.name)
+    registered = [rule.name for rule in BADGE_RULES]
+    # Badges no rule knows about (e.g. granted by hand) are kept at the end
+    return [name for name in registered if name in badges] + sorted(badges - set(registered))
+
+
+def _projection(rules: List[BadgeRule]) -> dict:
+    projection = {"_id": 1, "badges": 1}
+    for rule in rules:
+        projection.update({field: 1 for field in rule.fields})
+    return projection
+
+
+async def evaluate_badges(users_collection, user_filter: dict, event: str) -> Optional[List[str]]:
+    """Re-check the rules listening for event. Returns the badges, or None if no rule listens"""
+    rules = [rule for rule in BADGE_RULES if event in rule.events]
+    if not rules:
+        return None
+    user = await users_collection.find_one(user_filter, _projection(rules))
+    if not user:
+        return None
+    badges = apply_rules(user, rules)
+    if badges != (user.get("badges") or []):
+        await users_collection.update_one({"_id": user["_id"]}, {"$set": {"badges": badges}})
+    return badges
+
+
+async def recompute_all_badges(users_collection, batch_size: int = 1000, stale_only: bool = False) -> int:
+    """Evaluate every rule for every user, or with stale_only only for users not
+    stamped with the current BADGE_RULES_VERSION. Returns the number of users whose badges changed
+    """
+    changed = 0
+    batch = []
+    # $ne on the indexed stamp reads only the stale entries of the index
+    query = {"badge_rules": {"$ne": BADGE_RULES_VERSION}} if stale_only else {}
+    async for user in users_collection.find(query, _projection(BADGE_RULES)):
+        badges = apply_rules(user, BADGE_RULES)
+        if badges != (user.get("badges") or []):
+            changed += 1
+        batch.append(UpdateOne(
+            {"_id": user["_id"]},
+            {"$set": {"badges": badges, "badge_rules": BADGE_RULES_VERSION}}
+        ))
+        if len(batch) >= batch_size:
+            await users_collection.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        await users_collection.bulk_write(batch, ordered=False)
+    return changed
+
+
+async def main():
+    # Connect to MongoDB
+    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[os.environ.get('DB_NAME', 'student_signal')]
+
+    changed = await recompute_all_badges(db.users)
+    print(f"✅ Badges recomputed ({changed} users changed)")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
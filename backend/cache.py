@@ -0,0 +1,190 @@
+"""
+In-process response caching for read-mostly public endpoints.
+
+Entries hold pre-serialized JSON bytes plus ETag/Last-Modified validators so
+repeat views skip both the database and serialization, and conditional
+requests are answered with 304 Not Modified. SnapshotCache keeps a single
+computed value (e.g. dashboard stats) fresh in the background.
+WriteThroughCache holds a small keyed map in full, updated through the
+invalidation bus (invalidation.py) when writers publish a change.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import sha1
+from typing import Any, Awaitable, Callable, Hashable, Optional
+import asyncio
+import json
+import logging
+import time
+
+from cachetools import TTLCache
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    last_modified: datetime
+
+
+def serialize_json(payload: Any) -> bytes:
+    """Serialize a payload to compact JSON bytes"""
+    return json.dumps(jsonable_encoder(payload), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def prepare_response(payload: Any, last_modified: Optional[datetime] = None) -> CachedResponse:
+    """Serialize a payload once, with a strong ETag over the body"""
+    body = serialize_json(payload)
+    return CachedResponse(
+        body=body,
+        etag=f'"{sha1(body).hexdigest()}"',
+        last_modified=last_modified or datetime.now(timezone.utc).replace(microsecond=0),
+    )
+
+
+def conditional_response(entry: CachedResponse, request: Request, cache_control: str) -> Response:
+    """Response for a prepared entry, or 304 if the client's If-None-Match / If-Modified-Since matches"""
+    headers = {
+        "ETag": entry.etag,
+        "Last-Modified": format_datetime(entry.last_modified, usegmt=True),
+        "Cache-Control": cache_control,
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(",")]
+        if "*" in tags or entry.etag in tags or f"W/{entry.etag}" in tags:
+            return Response(status_code=304, headers=headers)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                since = None
+            if since is not None and since.tzinfo is not None and entry.last_modified <= since:
+                return Response(status_code=304, headers=headers)
+
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """Keyed cache of rendered JSON responses, cleared as a whole on writes"""
+
+    def __init__(self, maxsize: int = 512, ttl: int = 300, max_age: int = 60):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.max_age = max_age
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        return self._entries.get(key)
+
+    def set(self, key: Hashable, payload: Any) -> CachedResponse:
+        entry = prepare_response(payload, last_modified=self.last_modified)
+        self._entries[key] = entry
+        return entry
+
+    def invalidate(self) -> None:
+        """Drop every entry and move Last-Modified forward"""
+        self._entries.clear()
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+    def respond(self, entry: CachedResponse, request: Request) -> Response:
+        """Build the response for an entry, honouring If-None-Match / If-Modified-Since"""
+        return conditional_response(entry, request, f"public, max-age={self.max_age}")
+
+
+class SnapshotCache:
+    """Single cached value with a TTL, refreshed in the background once stale
+
+    Within ttl the snapshot is served as is. Between ttl and max_stale the
+    stale snapshot is served while one background task reloads it. Past
+    max_stale (or before the first load) callers wait for a reload, and
+    concurrent callers share that one load.
+    """
+
+    def __init__(self, loader: Callable[[], Awaitable[Any]], ttl: float = 30, max_stale: float = 300):
+        self.loader = loader
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._value: Any = None
+        self._loaded_at: Optional[float] = None
+        self._refresh: Optional[asyncio.Task] = None
+
+    @property
+    def age(self) -> Optional[float]:
+        return None if self._loaded_at is None else time.monotonic() - self._loaded_at
+
+    async def _load(self) -> Any:
+        value = await self.loader()
+        self._value = value
+        self._loaded_at = time.monotonic()
+        return value
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._load())
+            self._refresh.add_done_callback(self._log_failure)
+        return self._refresh
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception():
+            logger.error(f"Snapshot refresh failed: {task.exception()}")
+
+    async def get(self) -> Any:
+        age = self.age
+        if age is not None and age < self.ttl:
+            return self._value
+        if age is not None and age < self.max_stale:
+            self._start_refresh()
+            return self._value
+        # shield: a cancelled caller must not cancel the shared load
+        return await asyncio.shield(self._start_refresh())
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+
+class WriteThroughCache:
+    """Small keyed map held in full in memory, updated on the write path
+
+    loader() returns the whole map and key_loader(key) one entry (None if
+    absent). on_change(key) is meant to be subscribed to the invalidation
+    bus: a known key is re-read on its own, an unknown change reloads the map.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Awaitable[dict]],
+                 key_loader: Callable[[Hashable], Awaitable[Any]]):
+        self.name = name
+        self.loader = loader
+        self.key_loader = key_loader
+        self._entries: Optional[dict] = None
+
+    async def load(self) -> None:
+        self._entries = await self.loader()
+
+    async def get(self, key: Hashable, default: Any = None) -> Any:
+        if self._entries is None:
+            await self.load()
+        return self._entries.get(key, default)
+
+    async def refresh_key(self, key: Hashable) -> None:
+        value = await self.key_loader(key)
+        if self._entries is None:
+            return
+        if value is None:
+            self._entries.pop(key, None)
+        else:
+            self._entries[key] = value
+
+    async def on_change(self, key: Optional[Hashable] = None) -> None:
+        if key is None or self._entries is None:
+            await self.load()
+        else:
+            await self.refresh_key(key)
@@ -0,0 +1,122 @@
+"""
+Load test for the Elon chat endpoints.
+
+By default the app is loaded in-process with CHAT_BACKEND=stub, so no network
+or model quota is needed; only the guest endpoints work that way, since
+/api/chat needs a user in MongoDB. Point --url at a running server (started
+with CHAT_BACKEND=stub) to include /api/chat via --token and to measure real
+time-to-first-token on the streaming endpoints (the in-process transport
+buffers response bodies).
+
+All requests come from one client address (and, with --token, one user), so
+the per-IP/per-user chat rate limits would turn most of a run into 429s.
+In-process runs set CHAT_RATE_{USER,SESSION,IP}_PER_MINUTE=0 unless
+--rate-limits is given; start a server under test with the same variables to
+measure the backend rather than the limiter.
+
+    python chat_load_test.py --endpoint guest --requests 500 --concurrency 50
+    CHAT_BACKEND=stub CHAT_RATE_USER_PER_MINUTE=0 uvicorn server:app --port 8001
+    python chat_load_test.py --url http://localhost:8001 --endpoint user-stream --token <jwt>
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import Counter
+from uuid import uuid4
+
+import httpx
+
+ENDPOINTS = {
+    "guest": "/api/chat/guest",
+    "guest-stream": "/api/chat/guest/stream",
+    "user": "/api/chat",
+    "user-stream": "/api/chat/stream",
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def one_request(client, path, headers, message, results):
+    started = time.perf_counter()
+    first_byte = None
+    try:
+        async with client.stream("POST", path, json={"message": message}, headers=headers) as response:
+            async for _ in response.aiter_bytes():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started
+            results["status"][response.status_code] += 1
+    except httpx.HTTPError as e:
+        results["status"][type(e).__name__] += 1
+        return
+    results["latency"].append(time.perf_counter() - started)
+    if first_byte is not None:
+        results["ttfb"].append(first_byte)
+
+
+async def run(args):
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        os.environ.setdefault("CHAT_BACKEND", "stub")
+        if not args.rate_limits:
+            for name in ("USER", "SESSION", "IP"):
+                os.environ.setdefault(f"CHAT_RATE_{name}_PER_MINUTE", "0")
+        from server import app
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+
+    path = ENDPOINTS[args.endpoint]
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    results = {"status": Counter(), "latency": [], "ttfb": []}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(i):
+        # Unique questions by default so the guest FAQ cache doesn't hide the backend
+        message = args.message if args.repeat else f"{args.message} #{i}-{uuid4().hex[:6]}"
+        async with semaphore:
+            await one_request(client, path, headers, message, results)
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(bounded(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:.1f}ms"
+
+    print(f"{args.endpoint}: {args.requests} requests, concurrency {args.concurrency}, {elapsed:.2f}s")
+    print(f"  throughput  {args.requests / elapsed:.1f} req/s")
+    print(f"  status      {dict(results['status'])}")
+    for label, values in (("latency", results["latency"]), ("first byte", results["ttfb"])):
+        if values:
+            print(f"  {label:<11} p50 {ms(percentile(values, 50))}  p95 {ms(percentile(values, 95))}  "
+                  f"p99 {ms(percentile(values, 99))}  max {ms(max(values))}  mean {ms(statistics.mean(values))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Elon chat endpoints")
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process app with the stub backend)")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="guest")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--token", help="Bearer token for the authenticated endpoints")
+    parser.add_argument("--message", default="What is Student Signal?")
+    parser.add_argument("--repeat", action="store_true", help="Send the same message every time (exercises the FAQ cache)")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--rate-limits", action="store_true",
+                        help="Keep the chat rate limits on in-process (measures the limiter)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
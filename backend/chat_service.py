@@ -0,0 +1,290 @@
+"""
+Elon chat service.
+
+ElonChat sits in front of a pluggable ChatBackend: the remote Gemini model
+(EmergentChatBackend, one reused LlmChat per session) or a deterministic
+local stub for load testing (StubChatBackend), chosen with CHAT_BACKEND.
+Calls are bounded by a timeout; a streamed reply is abandoned when the
+client disconnects.
+FAQAnswerCache answers repeat guest questions locally.
+"""
+import asyncio
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import AsyncIterator, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+LLM_API_KEY = os.environ.get("EMERGENT_LLM_KEY", "sk-emergent-032766e07518853893")
+LLM_PROVIDER = "gemini"
+LLM_MODEL = "gemini-2.0-flash"
+CHAT_TIMEOUT_SECONDS = float(os.environ.get("CHAT_TIMEOUT_SECONDS", "30"))
+
+
+class ChatTimeout(Exception):
+    """Raised when the model does not answer within the timeout"""
+
+
+class ChatBackend(ABC):
+    """Interface for the model behind Elon; subclasses implement send and stream
+
+    Backends receive the chat key (scope, session_id) so they can keep
+    per-session state such as conversation history. The scope is the mode,
+    plus the owning user for authenticated chats, so a session_id sent by
+    another user never reaches someone else's conversation.
+    """
+
+    @abstractmethod
+    async def send(self, key: Tuple[str, str], system_message: str, text: str) -> str:
+        """Return the full reply"""
+
+    @abstractmethod
+    def stream(self, key: Tuple[str, str], system_message: str, text: str) -> AsyncIterator[str]:
+        """Yield the reply in chunks (an async generator)"""
+
+
+class EmergentChatBackend(ChatBackend):
+    """Remote Gemini model via emergentintegrations, one reused LlmChat per session"""
+
+    def __init__(self, maxsize: int = 2000, idle_ttl: int = 30 * 60):
+        self._clients: TTLCache = TTLCache(maxsize=maxsize, ttl=idle_ttl)
+        self._llm = None
+
+    def _llm_module(self):
+        # Imported once, on first use, so the app boots without the integration installed
+        if self._llm is None:
+            from emergentintegrations.llm import chat as llm_chat
+            self._llm = llm_chat
+        return self._llm
+
+    def _client(self, key: Tuple[str, str], system_message: str):
+        client, client_system_message = self._clients.get(key, (None, None))
+        if client is None or client_system_message != system_message:
+            # The system prompt is fixed per LlmChat, so a changed prompt (e.g. the
+            # user renamed themselves) starts a fresh client
+            client = self._llm_module().LlmChat(
+                api_key=LLM_API_KEY,
+                session_id=key[1],
+                system_message=system_message
+            ).with_model(LLM_PROVIDER, LLM_MODEL)
+        # Re-set on every use so active sessions don't expire
+        self._clients[key] = (client, system_message)
+        return client
+
+    async def send(self, key: Tuple[str, str], system_message: str, text: str) -> str:
+        client = self._client(key, system_message)
+        return await client.send_message(self._llm_module().UserMessage(text=text))
+
+    async def stream(self, key: Tuple[str, str], system_message: str, text: str) -> AsyncIterator[str]:
+        # LlmChat has no token streaming; the reply arrives as one chunk
+        yield await self.send(key, system_message, text)
+
+
+class StubChatBackend(ChatBackend):
+    """Deterministic local model for load testing; no network access
+
+    The reply depends only on the message text. first_token_latency simulates
+    time to first token and token_delay the gap between streamed tokens.
+    """
+
+    def __init__(self, first_token_latency: float = 0.5, token_delay: float = 0.02, reply_words: int = 40):
+        self.first_token_latency = first_token_latency
+        self.token_delay = token_delay
+        self.reply_words = reply_words
+
+    def _reply_tokens(self, text: str) -> list:
+        seed = int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+        words = ["Student", "Signal", "helps", "you", "find", "colleges", "and", "scholarships",
+                 "that", "fit", "your", "goals", "-", "save", "favorites", "in", "the", "Signal", "Hub."]
+        return [words[(seed + i) % len(words)] + " " for i in range(self.reply_words)]
+
+    async def send(self, key: Tuple[str, str], system_message: str, text: str) -> str:
+        tokens = self._reply_tokens(text)
+        await asyncio.sleep(self.first_token_latency + self.token_delay * (len(tokens) - 1))
+        return "".join(tokens).strip()
+
+    async def stream(self, key: Tuple[str, str], system_message: str, text: str) -> AsyncIterator[str]:
+        await asyncio.sleep(self.first_token_latency)
+        for i, token in enumerate(self._reply_tokens(text)):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            yield token
+
+
+def create_chat_backend() -> ChatBackend:
+    """Pick the backend from CHAT_BACKEND (emergent by default, or stub)"""
+    name = os.environ.get("CHAT_BACKEND", "emergent").lower()
+    if name == "stub":
+        return StubChatBackend(
+            first_token_latency=float(os.environ.get("CHAT_STUB_LATENCY_MS", "500")) / 1000,
+            token_delay=float(os.environ.get("CHAT_STUB_TOKEN_DELAY_MS", "20")) / 1000,
+        )
+    if name != "emergent":
+        raise ValueError(f"Unknown CHAT_BACKEND '{name}'")
+    return EmergentChatBackend()
+
+
+class ElonChat:
+    """Front door for Elon chats: session tracking and timeouts over a backend"""
+
+    def __init__(self, backend: ChatBackend, timeout: float = CHAT_TIMEOUT_SECONDS, limiter=None,
+                 maxsize: int = 2000, idle_ttl: int = 30 * 60):
+        self.backend = backend
+        self.timeout = timeout
+        # Optional concurrency limiter (acquire/release) around every backend call
+        self.limiter = limiter
+        # Session key -> exchanges answered outside the backend (FAQ cache hits)
+        # that the backend hasn't seen yet
+        self._sessions: TTLCache = TTLCache(maxsize=maxsize, ttl=idle_ttl)
+
+    @staticmethod
+    def _key(mode: str, session_id: str, owner: Optional[str] = None) -> Tuple[str, str]:
+        return (f"{mode}:{owner}" if owner else mode, session_id)
+
+    def has_session(self, mode: str, session_id: Optional[str], owner: Optional[str] = None) -> bool:
+        return bool(session_id) and self._key(mode, session_id, owner) in self._sessions
+
+    def record_exchange(self, mode: str, session_id: str, question: str, answer: str,
+                        owner: Optional[str] = None) -> None:
+        """Register a session whose turn was answered without the backend (e.g. from the FAQ cache)
+
+        The exchange is passed to the backend with the session's next message,
+        so the model knows what was already said.
+        """
+        key = self._key(mode, session_id, owner)
+        self._sessions[key] = self._sessions.get(key, []) + [(question, answer)]
+
+    def _with_history(self, key: Tuple[str, str], text: str) -> str:
+        earlier: List[Tuple[str, str]] = self._sessions.get(key) or []
+        self._sessions[key] = []
+        if not earlier:
+            return text
+        lines = ["Earlier in this conversation:"]
+        for question, answer in earlier:
+            lines += [f"Student: {question}", f"You: {answer}"]
+        return "\n".join(lines) + f"\n\nStudent's new message: {text}"
+
+    async def send(self, mode: str, session_id: str, system_message: str, text: str,
+                   owner: Optional[str] = None) -> str:
+        """Send a message and wait for the full reply; owner scopes the session to a user"""
+        key = self._key(mode, session_id, owner)
+        if self.limiter:
+            await self.limiter.acquire()
+        try:
+            text = self._with_history(key, text)
+            return await asyncio.wait_for(self.backend.send(key, system_message, text), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise ChatTimeout(f"No reply within {self.timeout}s")
+        finally:
+            if self.limiter:
+                self.limiter.release()
+
+    async def stream(self, mode: str, session_id: str, system_message: str, text: str,
+                     owner: Optional[str] = None) -> AsyncIterator[str]:
+        """Yield reply chunks as the backend produces them, within the overall timeout"""
+        key = self._key(mode, session_id, owner)
+        if self.limiter:
+            await self.limiter.acquire()
+        text = self._with_history(key, text)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        chunks = self.backend.stream(key, system_message, text).__aiter__()
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise ChatTimeout(f"No complete reply within {self.timeout}s")
+                try:
+                    yield await asyncio.wait_for(chunks.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    return
+                except asyncio.TimeoutError:
+                    raise ChatTimeout(f"No complete reply within {self.timeout}s")
+        finally:
+            await chunks.aclose()
+            if self.limiter:
+                self.limiter.release()
+
+
+_APOSTROPHE_RE = re.compile(r"['\u2019]")
+_NON_WORD_RE = re.compile(r"[^a-z0-9\s]")
+_STOPWORDS = frozenset(
+    "a an the is are was were be do does did can could i you we it its this that "
+    "to of for in on at and or my me your please hi hey hello tell about what whats".split()
+)
+
+
+def word_form(word: str) -> str:
+    """Fold common inflections so "scholarships"/"scholarship" and "applying"/"apply" match"""
+    if len(word) > 4 and word.endswith(("ies", "ied")):
+        return word[:-3] + "y"
+    for suffix in ("ing", "ed"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def canonicalize_question(text: str) -> Tuple[str, ...]:
+    """Lowercase, strip punctuation and filler words, fold word forms; tokens stay in order
+
+    Order is kept so "is X better than Y" and "is Y better than X" stay different questions.
+    """
+    words = _NON_WORD_RE.sub(" ", _APOSTROPHE_RE.sub("", text.lower())).split()
+    return tuple(word_form(w) for w in words if w not in _STOPWORDS)
+
+
+class FAQAnswerCache:
+    """Answers to standalone guest questions, matched on canonicalized text
+
+    Only questions with the same canonical key match: they differ at most in
+    filler words, punctuation and word forms. A question that names a
+    different college or adds a "not" is a different question, so there is
+    no similarity-based matching.
+    """
+
+    def __init__(self, maxsize: int = 1000, ttl: int = 24 * 60 * 60, max_question_words: int = 20):
+        self._answers: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.max_question_words = max_question_words
+        self.hits = 0
+        self.misses = 0
+
+    def cacheable(self, text: str) -> bool:
+        """Only short questions are treated as FAQ-style"""
+        return 0 < len(text.split()) <= self.max_question_words
+
+    def get(self, text: str) -> Optional[str]:
+        key = canonicalize_question(text)
+        answer = self._answers.get(key) if key else None
+        if answer is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return answer
+
+    def set(self, text: str, answer: str) -> None:
+        key = canonicalize_question(text)
+        if key:
+            self._answers[key] = answer
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._answers),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Format one server-sent event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
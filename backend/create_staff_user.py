@@ -37,7 +37,7 @@ async def create_staff_user(email, password, first_name, last_name):
             # Update to admin
             await users_collection.update_one(
                 {"email": email},
-                {"$set": {"role": "admin", "updated_at": datetime.utcnow().isoformat()}}
+                {"$set": {"role": "admin", "updated_at": datetime.utcnow()}}
             )
             print(f"✅ Updated user to admin role")
         return
@@ -53,8 +53,8 @@ async def create_staff_user(email, password, first_name, last_name):
         'saved_colleges': [],
         'saved_scholarships': [],
         'onboarding_completed': True,  # Staff don't need onboarding
-        'created_at': datetime.utcnow().isoformat(),
-        'updated_at': datetime.utcnow().isoformat()
+        'created_at': datetime.utcnow(),
+        'updated_at': datetime.utcnow()
     }
     
     await users_collection.insert_one(user_dict)
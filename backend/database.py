@@ -1,6 +1,13 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime
+from datetime import datetime, timezone
 import os
+import logging
+
+from models import CollegeUI, CollegeCard, ScholarshipUI, ScholarshipCard, Article, ArticleCard
+from reference_data import LOOKUP_INDEXES, SEARCH_INDEXES
+from lead_rollups import ROLLUP_INDEXES
+
+logger = logging.getLogger(__name__)
 
 # MongoDB connection
 mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
@@ -15,12 +22,45 @@ scholarships_ui_collection = db.scholarships_ui  # New flat UI-optimized schema
 users_collection = db.users
 ipeds_sync_collection = db.ipeds_sync
 leads_collection = db.leads
+lead_rollups_collection = db.lead_rollups  # Lead counts per (day, college_id, source)
 articles_collection = db.articles
 todos_collection = db.todos
 institutions_collection = db.institutions
 high_schools_collection = db.high_schools
 mega_menu_features_collection = db.mega_menu_features
 announcement_bars_collection = db.announcement_bars
+rate_limits_collection = db.rate_limits  # Shared token buckets (optional)
+cache_versions_collection = db.cache_versions  # Version counters for cross-worker cache invalidation
+
+# Projections
+def projection_for(model) -> dict:
+    """Build a projection that loads only the fields a model declares"""
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+
+SCHOLARSHIP_CARD_PROJECTION = projection_for(ScholarshipCard)
+
+# Named projection profiles per resource:
+#   card   - lean list/tile payload
+#   detail - every field the public model declares
+#   admin  - the raw stored document
+PROJECTION_PROFILES = {
+    "colleges": {
+        "card": projection_for(CollegeCard),
+        "detail": projection_for(CollegeUI),
+        "admin": {"_id": 0},
+    },
+    "scholarships": {
+        "card": SCHOLARSHIP_CARD_PROJECTION,
+        "detail": projection_for(ScholarshipUI),
+        "admin": {"_id": 0},
+    },
+    "articles": {
+        "card": projection_for(ArticleCard),
+        "detail": projection_for(Article),
+        "admin": {"_id": 0},
+    },
+}
 
 
 async def get_db():
@@ -29,6 +69,19 @@ async def get_db():
 
 
 # Helper functions
+#
+# Timestamp policy: timestamps are stored as native BSON datetimes in naive UTC
+# (what datetime.utcnow() returns) so range queries and sorts can use indexes.
+# They are converted to ISO strings only on the way out, in serialize_doc or by
+# FastAPI's encoder. migrate_timestamps.py converts legacy ISO-string fields.
+
+def as_utc(value: datetime) -> datetime:
+    """Normalize a datetime to naive UTC for storage and range queries"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
 def serialize_doc(doc: dict) -> dict:
     """Convert MongoDB document to JSON-serializable format"""
     if doc:
@@ -43,32 +96,79 @@ def serialize_doc(doc: dict) -> dict:
 
 def prepare_for_mongo(data: dict) -> dict:
     """Prepare data for MongoDB insertion"""
-    # Convert datetime objects to ISO strings
+    # Keep datetimes native, normalized to naive UTC
     for key, value in data.items():
         if isinstance(value, datetime):
-            data[key] = value.isoformat()
+            data[key] = as_utc(value)
     return data
 
 
+async def ensure_index(collection, keys, **kwargs):
+    """Create an index, logging instead of failing startup on conflicts or bad legacy data"""
+    try:
+        await collection.create_index(keys, **kwargs)
+    except Exception as e:
+        logger.warning(f"Could not create index {keys} on {collection.name}: {e}")
+
+
 async def init_db():
     """Initialize database with indexes"""
     # Create indexes for better query performance
-    await colleges_collection.create_index("id", unique=True)
-    await colleges_collection.create_index("name")
-    await colleges_collection.create_index("state")
-    await colleges_collection.create_index("type")
-    await colleges_collection.create_index("ipeds_id")
+    await ensure_index(colleges_collection, "id", unique=True)
+    await ensure_index(colleges_collection, "name")
+    await ensure_index(colleges_collection, "state")
+    await ensure_index(colleges_collection, "type")
+    await ensure_index(colleges_collection, "ipeds_id")
+    
+    await ensure_index(scholarships_collection, "id", unique=True)
+    await ensure_index(scholarships_collection, "name")
+    await ensure_index(scholarships_collection, "category")
+    
+    await ensure_index(scholarships_ui_collection, "id")
+    await ensure_index(scholarships_ui_collection, "slug")
+    
+    await ensure_index(users_collection, "id", unique=True)
+    await ensure_index(users_collection, "email", unique=True)
+    await ensure_index(users_collection, "created_at")
+    await ensure_index(users_collection, "badge_rules")
+    
+    await ensure_index(leads_collection, "id", unique=True)
+    await ensure_index(leads_collection, "email")
+    await ensure_index(leads_collection, "college_id")
+    await ensure_index(leads_collection, "created_at")
+    await ensure_index(leads_collection, [("created_at", 1), ("id", 1)])
+    
+    for keys, kwargs in ROLLUP_INDEXES:
+        await ensure_index(lead_rollups_collection, keys, **kwargs)
+    
+    # Onboarding typeahead (anchored prefix on name_key) and importer lookups
+    for collection in (institutions_collection, high_schools_collection):
+        for keys, kwargs in LOOKUP_INDEXES[collection.name] + SEARCH_INDEXES[collection.name]:
+            await ensure_index(collection, keys, **kwargs)
     
-    await scholarships_collection.create_index("id", unique=True)
-    await scholarships_collection.create_index("name")
-    await scholarships_collection.create_index("category")
+    await ensure_index(todos_collection, "id", unique=True)
+    await ensure_index(
+        todos_collection,
+        [("user_id", 1), ("completed", 1), ("has_due_date", -1), ("due_date", 1), ("created_at", 1)]
+    )
     
-    await users_collection.create_index("id", unique=True)
-    await users_collection.create_index("email", unique=True)
+    await ensure_index(announcement_bars_collection, [("status", 1), ("end_date", 1)])
     
-    await leads_collection.create_index("id", unique=True)
-    await leads_collection.create_index("email")
-    await leads_collection.create_index("college_id")
-    await leads_collection.create_index("created_at")
+    await ensure_index(articles_collection, "slug")
+    await ensure_index(articles_collection, [("created_at", -1)])
+    await ensure_index(articles_collection, [("category", 1), ("created_at", -1)])
+    await ensure_index(articles_collection, [("is_published", 1), ("published_at", -1)])
+    # A collection allows one text index, so an older articles_text_search
+    # without category is dropped before the current one is built
+    indexes = await articles_collection.index_information()
+    text_index = indexes.get("articles_text_search")
+    if text_index and "category" not in (text_index.get("weights") or {}):
+        await articles_collection.drop_index("articles_text_search")
+    await ensure_index(
+        articles_collection,
+        [("title", "text"), ("summary", "text"), ("category", "text")],
+        name="articles_text_search",
+        weights={"title": 3, "summary": 1, "category": 2}
+    )
     
-    print("Database indexes created successfully")
+    print("Database indexes ensured")
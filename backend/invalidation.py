@@ -0,0 +1,158 @@
+"""
+Cross-worker cache invalidation.
+
+In-process caches subscribe to a collection (optionally reading a key field
+from changed documents) and are called back when it changes, in this worker
+or any other. Delivery uses a MongoDB change stream when the deployment
+supports one (replica set / Atlas), so writes from scripts and other
+services are seen too. Otherwise it falls back to version counters in the
+cache_versions collection, bumped by publish() and polled by every worker.
+
+Writers call publish() after a write: local subscribers run immediately,
+other workers follow within one change-stream event or poll interval. With
+change streams the writing worker is notified a second time by its own
+event, so callbacks must be idempotent.
+"""
+import asyncio
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# callback(key): key is the changed document's key field, or None for "anything may have changed"
+Callback = Callable[[Optional[Any]], Union[None, Awaitable[None]]]
+
+MODES = ("auto", "change_stream", "poll")
+
+
+class InvalidationBus:
+    """Routes collection changes to subscribed caches; mode is auto, change_stream or poll"""
+
+    def __init__(self, db, versions, mode: str = "auto", poll_interval: float = 5, retry_interval: float = 30):
+        if mode not in MODES:
+            raise ValueError(f"Unknown invalidation mode '{mode}'")
+        self.db = db
+        self.versions = versions
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.retry_interval = retry_interval
+        # Mode actually in use once started: change_stream or poll
+        self.active_mode: Optional[str] = None
+        self._subscribers: Dict[str, List[Tuple[Callback, Optional[str]]]] = {}
+        self._seen_versions: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, collection_name: str, callback: Callback, key_field: Optional[str] = None) -> None:
+        """Call callback(key) when collection_name changes; key comes from key_field when known"""
+        self._subscribers.setdefault(collection_name, []).append((callback, key_field))
+
+    async def _notify(self, collection_name: str, document: Optional[dict] = None, key: Any = None) -> None:
+        for callback, key_field in self._subscribers.get(collection_name, []):
+            if key_field is None:
+                value = None
+            elif document is not None:
+                value = document.get(key_field)
+            else:
+                value = key
+            try:
+                result = callback(value)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Invalidation callback for {collection_name} failed: {e}")
+
+    async def _notify_all(self) -> None:
+        for collection_name in self._subscribers:
+            await self._notify(collection_name)
+
+    async def publish(self, collection_name: str, key: Any = None) -> None:
+        """Announce a write: notify this worker now and bump the shared version counter"""
+        await self._notify(collection_name, key=key)
+        doc = await self.versions.find_one_and_update(
+            {"_id": collection_name},
+            {"$inc": {"version": 1}, "$set": {"key": key}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        # Skip our own bump when polling, unless another worker's write landed in between
+        if doc["version"] == self._seen_versions.get(collection_name, 0) + 1:
+            self._seen_versions[collection_name] = doc["version"]
+
+    async def _watch(self) -> None:
+        pipeline = [{"$match": {"ns.coll": {"$in": list(self._subscribers)}}}]
+        async with self.db.watch(pipeline, full_document="updateLookup") as stream:
+            self.active_mode = "change_stream"
+            logger.info("Cache invalidation: change stream")
+            async for change in stream:
+                await self._notify(change["ns"]["coll"], document=change.get("fullDocument"))
+
+    async def _poll_once(self) -> None:
+        async for doc in self.versions.find({"_id": {"$in": list(self._subscribers)}}):
+            name = doc["_id"]
+            seen = self._seen_versions.get(name, 0)
+            if doc["version"] == seen:
+                continue
+            self._seen_versions[name] = doc["version"]
+            # Exactly one write since we looked: that write's key; otherwise everything
+            key = doc.get("key") if doc["version"] == seen + 1 else None
+            await self._notify(name, key=key)
+
+    async def _poll(self) -> None:
+        self.active_mode = "poll"
+        logger.info(f"Cache invalidation: polling every {self.poll_interval}s")
+        while True:
+            try:
+                await self._poll_once()
+            except Exception as e:
+                logger.error(f"Cache version poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _run(self) -> None:
+        if self.mode != "poll":
+            while True:
+                try:
+                    await self._watch()
+                except PyMongoError as e:
+                    if self.active_mode is None:
+                        if self.mode == "change_stream":
+                            logger.error(f"Change stream unavailable, retrying in {self.retry_interval}s: {e}")
+                            await asyncio.sleep(self.retry_interval)
+                            continue
+                        logger.info(f"Change streams unavailable ({e}); falling back to version polling")
+                        break
+                    # Events may have been missed while the stream was down
+                    logger.warning(f"Change stream interrupted, reopening: {e}")
+                    await self._notify_all()
+                    await asyncio.sleep(self.poll_interval)
+        await self._poll()
+
+    async def start(self) -> None:
+        if not self._subscribers:
+            return
+        # Versions as of startup, so old bumps aren't replayed when polling
+        try:
+            async for doc in self.versions.find({"_id": {"$in": list(self._subscribers)}}):
+                self._seen_versions[doc["_id"]] = doc["version"]
+        except Exception as e:
+            logger.error(f"Could not read cache versions: {e}")
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.active_mode,
+            "subscriptions": {name: len(subs) for name, subs in self._subscribers.items()},
+        }
@@ -142,13 +142,13 @@ class IPEDSIntegration:
             for college_data in colleges:
                 try:
                     # Add timestamps
-                    college_data['created_at'] = datetime.utcnow().isoformat()
-                    college_data['updated_at'] = datetime.utcnow().isoformat()
+                    now = datetime.utcnow()
+                    college_data['updated_at'] = now
                     
                     # Upsert (update if exists, insert if not)
                     result = await db.colleges.update_one(
                         {'ipeds_id': college_data['ipeds_id']},
-                        {'$set': college_data},
+                        {'$set': college_data, '$setOnInsert': {'created_at': now}},
                         upsert=True
                     )
                     
@@ -160,7 +160,7 @@ class IPEDSIntegration:
             
             # Update sync status
             sync_status = {
-                'last_sync': datetime.utcnow().isoformat(),
+                'last_sync': datetime.utcnow(),
                 'total_records': len(colleges),
                 'updated': updated,
                 'failed': failed,
@@ -168,6 +168,7 @@ class IPEDSIntegration:
             }
             
             await db.ipeds_sync.insert_one(sync_status)
+            sync_status.pop('_id', None)
             
             return sync_status
             
@@ -176,7 +177,7 @@ class IPEDSIntegration:
             return {
                 'status': 'failed',
                 'error': str(e),
-                'last_sync': datetime.utcnow().isoformat()
+                'last_sync': datetime.utcnow()
             }
     
     def download_ipeds_csv(self, year: int, dataset: str = 'HD') -> str:
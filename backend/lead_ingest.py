@@ -0,0 +1,156 @@
+"""
+Batched lead ingestion.
+
+Leads are queued in memory and written with insert_many once a batch fills up
+or the flush interval passes. Each submit() waits until its batch has been
+written, so a request is only acknowledged after its lead is in MongoDB.
+The bounded queue provides backpressure during campaign spikes.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+# Queued by stop() to wake an idle writer; never written
+_WAKE = object()
+
+
+class IngestQueueFull(Exception):
+    """Raised when the pending queue stays full past the enqueue timeout"""
+
+
+class LeadWriter:
+    """Buffers lead documents and flushes them to a collection in batches"""
+
+    def __init__(
+        self,
+        collection,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        max_pending: int = 10000,
+        enqueue_timeout: float = 2.0,
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._on_flush: List[Callable[[List[dict]], Awaitable[None]]] = []
+
+    def on_flush(self, callback: Callable[[List[dict]], Awaitable[None]]) -> None:
+        """Register a coroutine called with every successfully written batch"""
+        self._on_flush.append(callback)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush whatever is queued or being batched and stop the background writer"""
+        if self._task is None:
+            return
+        # The writer finishes its current batch and drains the queue before exiting
+        self._stopping = True
+        try:
+            self._queue.put_nowait(_WAKE)
+        except asyncio.QueueFull:
+            # Queue is full, so the writer is busy and will see the flag
+            pass
+        await self._task
+        self._task = None
+        self._stopping = False
+        # Leads queued while the writer was exiting
+        while not self._queue.empty():
+            await self._flush(self._drain(self.batch_size))
+
+    async def submit(self, doc: dict) -> None:
+        """Queue a lead and wait until it has been written"""
+        if self._task is None:
+            # Writer not running (e.g. scripts/tests): write straight through
+            await self.collection.insert_one(doc)
+            await self._run_hooks([doc])
+            return
+
+        done = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(self._queue.put((doc, done)), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            raise IngestQueueFull(f"{self._queue.maxsize} leads already pending")
+        await done
+
+    def _drain(self, limit: int) -> list:
+        batch = []
+        while len(batch) < limit and not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _WAKE:
+                batch.append(item)
+        return batch
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            item = await self._queue.get()
+            batch = [] if item is _WAKE else [item]
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+            while len(batch) < self.batch_size and not self._stopping:
+                batch.extend(self._drain(self.batch_size - len(batch)))
+                remaining = deadline - asyncio.get_running_loop().time()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is not _WAKE:
+                    batch.append(item)
+            await self._flush(batch)
+
+        # Not cancelled on shutdown, so nothing already taken off the queue is lost
+        while not self._queue.empty():
+            await self._flush(self._drain(self.batch_size))
+
+    async def _flush(self, batch: list) -> None:
+        if not batch:
+            return
+        docs = [doc for doc, _ in batch]
+        failed = {}
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = error.get("errmsg", "write failed")
+        except Exception as e:
+            logger.error(f"Lead batch insert failed ({len(batch)} leads): {e}")
+            for _, done in batch:
+                if not done.done():
+                    done.set_exception(e)
+            return
+
+        written = []
+        for i, (doc, done) in enumerate(batch):
+            if i not in failed:
+                written.append(doc)
+            # A waiter may have gone away (client disconnect) before the write
+            if done.done():
+                continue
+            if i in failed:
+                done.set_exception(RuntimeError(failed[i]))
+            else:
+                done.set_result(None)
+
+        await self._run_hooks(written)
+
+    async def _run_hooks(self, written: List[dict]) -> None:
+        for callback in self._on_flush:
+            try:
+                await callback(written)
+            except Exception as e:
+                logger.error(f"Lead flush hook failed: {e}")
@@ -0,0 +1,173 @@
+"""
+Per-college lead rollups.
+
+lead_rollups holds one document per (day, college_id, source) with a running
+count, incremented as leads are written. Analytics read these buckets instead
+of re-aggregating the raw leads collection.
+
+Run directly to rebuild the rollups from the leads collection:
+    python lead_rollups.py
+
+The rebuild counts into a temporary collection and renames it over
+lead_rollups, so readers never see empty or partial rollups and a failed
+rebuild leaves the old ones in place. Pause lead ingestion (stop the API
+workers or take the lead form offline) while it runs: increments the API
+applies to the old collection during a rebuild are lost in the swap.
+
+The server builds the rollups itself at startup when they are empty and
+leads exist (first deploy, or after the collection was dropped), before it
+starts accepting leads; see ensure_lead_rollups.
+"""
+import asyncio
+from collections import Counter
+from datetime import date, datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from typing import Dict, Iterable, List, Optional
+import os
+
+# (keys, options) for lead_rollups; also applied to the rebuild's temporary collection
+ROLLUP_INDEXES = [
+    ([("day", 1), ("college_id", 1), ("source", 1)], {"unique": True}),
+    ([("college_id", 1), ("day", 1)], {}),
+]
+
+
+def lead_day(created_at) -> str:
+    """Bucket day (YYYY-MM-DD, UTC) for a lead's created_at"""
+    if isinstance(created_at, datetime):
+        return created_at.strftime("%Y-%m-%d")
+    return str(created_at)[:10]
+
+
+def week_start(day: str) -> str:
+    """Monday of the ISO week containing day"""
+    d = date.fromisoformat(day)
+    return (d - timedelta(days=d.weekday())).isoformat()
+
+
+async def record_leads(rollups_collection, leads: Iterable[dict]) -> None:
+    """Increment rollup buckets for newly written leads"""
+    counts = Counter()
+    names = {}
+    for lead in leads:
+        key = (lead_day(lead["created_at"]), lead["college_id"], lead.get("source", "website"))
+        counts[key] += 1
+        names[lead["college_id"]] = lead.get("college_name")
+
+    if not counts:
+        return
+
+    await rollups_collection.bulk_write([
+        UpdateOne(
+            {"day": day, "college_id": college_id, "source": source},
+            {"$inc": {"count": count}, "$set": {"college_name": names[college_id]}},
+            upsert=True
+        )
+        for (day, college_id, source), count in counts.items()
+    ], ordered=False)
+
+
+async def query_lead_rollups(
+    rollups_collection,
+    start_day: str,
+    end_day: str,
+    college_id: Optional[str] = None,
+    granularity: str = "day"
+) -> List[dict]:
+    """Lead counts per college between two days (inclusive), bucketed by day or week"""
+    match = {"day": {"$gte": start_day, "$lte": end_day}}
+    if college_id:
+        match["college_id"] = college_id
+
+    rows = await rollups_collection.aggregate([
+        {"$match": match},
+        {"$group": {
+            "_id": {"college_id": "$college_id", "day": "$day"},
+            "college_name": {"$last": "$college_name"},
+            "count": {"$sum": "$count"}
+        }}
+    ]).to_list(None)
+
+    colleges: Dict[str, dict] = {}
+    for row in rows:
+        cid = row["_id"]["college_id"]
+        period = row["_id"]["day"] if granularity == "day" else week_start(row["_id"]["day"])
+        entry = colleges.setdefault(cid, {
+            "college_id": cid,
+            "college_name": row.get("college_name"),
+            "total": 0,
+            "buckets": Counter()
+        })
+        entry["buckets"][period] += row["count"]
+        entry["total"] += row["count"]
+
+    result = []
+    for entry in sorted(colleges.values(), key=lambda e: e["total"], reverse=True):
+        entry["buckets"] = [{"period": p, "count": c} for p, c in sorted(entry["buckets"].items())]
+        result.append(entry)
+    return result
+
+
+async def daily_lead_totals(rollups_collection, start_day: str, end_day: str) -> Dict[str, int]:
+    """Lead counts per day across all colleges"""
+    rows = await rollups_collection.aggregate([
+        {"$match": {"day": {"$gte": start_day, "$lte": end_day}}},
+        {"$group": {"_id": "$day", "count": {"$sum": "$count"}}}
+    ]).to_list(None)
+    return {row["_id"]: row["count"] for row in rows}
+
+
+async def rebuild_lead_rollups(leads_collection, rollups_collection, batch_size: int = 1000) -> int:
+    """Recompute every rollup bucket from the raw leads collection and swap them in
+
+    Lead ingestion must be paused while this runs (see module docstring).
+    """
+    # Per process, so workers starting together don't share a staging collection
+    staging = rollups_collection.database[f"{rollups_collection.name}_rebuild_{os.getpid()}"]
+    await staging.drop()
+    for keys, kwargs in ROLLUP_INDEXES:
+        await staging.create_index(keys, **kwargs)
+
+    total = 0
+    batch = []
+    projection = {"_id": 0, "created_at": 1, "college_id": 1, "college_name": 1, "source": 1}
+    try:
+        async for lead in leads_collection.find({}, projection).batch_size(batch_size):
+            batch.append(lead)
+            if len(batch) >= batch_size:
+                await record_leads(staging, batch)
+                total += len(batch)
+                batch = []
+        await record_leads(staging, batch)
+        total += len(batch)
+        # Atomic swap; the staging collection exists (it has indexes) even with no leads
+        await staging.rename(rollups_collection.name, dropTarget=True)
+    finally:
+        await staging.drop()
+    return total
+
+
+async def ensure_lead_rollups(leads_collection, rollups_collection) -> Optional[int]:
+    """Build the rollups when there are leads but no rollups yet. Returns leads counted, or None if skipped"""
+    if await rollups_collection.find_one({}, {"_id": 1}):
+        return None
+    if not await leads_collection.find_one({}, {"_id": 1}):
+        return None
+    return await rebuild_lead_rollups(leads_collection, rollups_collection)
+
+
+async def main():
+    # Connect to MongoDB
+    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[os.environ.get('DB_NAME', 'student_signal')]
+
+    total = await rebuild_lead_rollups(db.leads, db.lead_rollups)
+    print(f"✅ Rebuilt lead rollups from {total} leads")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
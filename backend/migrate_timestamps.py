@@ -0,0 +1,60 @@
+"""
+Migration: convert ISO-string timestamp fields to native BSON datetimes.
+
+Older code paths (register, prepare_for_mongo, IPEDS sync, saved-item updates,
+create_staff_user) stored timestamps as ISO strings. The conversion runs
+server-side with $dateFromString, one update per field, and only touches
+documents where the field is still a string, so it is safe to re-run.
+
+    python migrate_timestamps.py
+"""
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+
+# collection -> timestamp fields that may hold ISO strings
+TIMESTAMP_FIELDS = {
+    "users": ["created_at", "updated_at"],
+    "leads": ["created_at"],
+    "colleges": ["created_at", "updated_at"],
+    "scholarships": ["created_at", "updated_at"],
+    "ipeds_sync": ["last_sync"],
+    "todos": ["created_at", "updated_at", "due_date"],
+    "articles": ["created_at", "updated_at", "published_at"],
+}
+
+
+async def migrate_timestamps(db) -> dict:
+    """Convert string timestamps in place. Returns modified counts per collection.field"""
+    results = {}
+    for collection_name, fields in TIMESTAMP_FIELDS.items():
+        collection = db[collection_name]
+        for field in fields:
+            result = await collection.update_many(
+                {field: {"$type": "string"}},
+                [{"$set": {field: {"$dateFromString": {
+                    # Naive strings are read as UTC; unparseable values are left as-is
+                    "dateString": f"${field}",
+                    "onError": f"${field}"
+                }}}}]
+            )
+            results[f"{collection_name}.{field}"] = result.modified_count
+    return results
+
+
+async def main():
+    # Connect to MongoDB
+    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[os.environ.get('DB_NAME', 'student_signal')]
+
+    results = await migrate_timestamps(db)
+    for field, modified in results.items():
+        print(f"  {field}: {modified} converted")
+    print("✅ Timestamp migration complete!")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+"""
+Migration: set the stored `completed` and `has_due_date` flags on existing to-dos.
+
+GET /api/todos filters and sorts on (user_id, completed, has_due_date,
+due_date); older to-dos only have `status` and `due_date`. The flags are
+derived server-side and only documents without them are touched, so it is
+safe to re-run. The server also runs it at startup.
+
+    python migrate_todos.py
+"""
+import asyncio
+from motor.motor_asyncio import AsyncIOMotorClient
+import os
+
+COMPLETED_STATUS = "Completed"
+
+
+async def migrate_todos(db) -> int:
+    """Backfill completed from status and has_due_date from due_date. Returns the number of updates"""
+    completed = await db.todos.update_many(
+        {"completed": {"$exists": False}},
+        [{"$set": {"completed": {"$eq": ["$status", COMPLETED_STATUS]}}}]
+    )
+    dated = await db.todos.update_many(
+        {"has_due_date": {"$exists": False}},
+        [{"$set": {"has_due_date": {"$ne": [{"$ifNull": ["$due_date", None]}, None]}}}]
+    )
+    return completed.modified_count + dated.modified_count
+
+
+async def main():
+    # Connect to MongoDB
+    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[os.environ.get('DB_NAME', 'student_signal')]
+
+    updated = await migrate_todos(db)
+    print(f"  todos: {updated} updated")
+    print("✅ To-do migration complete!")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field, EmailStr, ConfigDict
 from typing import List, Optional
 from datetime import datetime
+import re
+import unicodedata
 import uuid
 
 
@@ -117,6 +119,7 @@ class CollegeUI(BaseDBModel):
     website: Optional[str] = None
     canonicalUrl: Optional[str] = None
     imageUrl: Optional[str] = None  # College campus image
+    alias: Optional[str] = None  # IPEDS alternate names, e.g. "UCLA"
     isActive: bool = True
     
     # Timestamps
@@ -128,6 +131,23 @@ class CollegeUI(BaseDBModel):
     sourceCollection: Optional[str] = None
 
 
+class CollegeCard(BaseDBModel):
+    """Lean college card for list views"""
+    name: str
+    slug: str
+    city: Optional[str] = None
+    state: Optional[str] = None
+    publicPrivate: Optional[str] = None
+    degreeLevel: Optional[str] = None
+    inStateTuition: Optional[int] = None
+    avgNetPrice: Optional[int] = None
+    acceptanceRate: Optional[int] = None
+    satAvg: Optional[int] = None
+    actAvg: Optional[int] = None
+    imageUrl: Optional[str] = None
+    ipedsId: Optional[str] = None
+
+
 # Legacy models for backward compatibility (admin panel)
 class CollegeCreate(BaseModel):
     name: str
@@ -254,6 +274,26 @@ class ScholarshipUI(BaseDBModel):
     sourceCollection: Optional[str] = None
 
 
+class ScholarshipCard(BaseDBModel):
+    """Lean scholarship card (no description/eligibility bodies)"""
+    id: str
+    slug: str
+    name: str
+    amount: str
+    amountMin: Optional[int] = None
+    amountMax: Optional[int] = None
+    deadline: Optional[datetime] = None
+    deadlineDisplay: Optional[str] = None
+    isRolling: bool = False
+    type: Optional[str] = None
+    category: Optional[str] = None
+    tags: List[str] = []
+    renewable: bool = False
+    sponsor: Optional[str] = None
+    imageUrl: Optional[str] = None
+    featured: bool = False
+
+
 # User Models
 class User(BaseDBModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -459,6 +499,26 @@ class Article(BaseDBModel):
     created_at: datetime
     updated_at: datetime
     read_time_minutes: Optional[int] = None
+    word_count: Optional[int] = None
+    excerpt: Optional[str] = None
+
+
+class ArticleCard(BaseDBModel):
+    """Lean article card for list views (no body)"""
+    id: str
+    title: str
+    slug: str
+    summary: str
+    main_image_url: Optional[str] = None
+    video_url: Optional[str] = None
+    category: str
+    tags: List[str] = []
+    is_featured: bool = False
+    is_video: bool = False
+    is_published: bool = False
+    published_at: Optional[datetime] = None
+    read_time_minutes: Optional[int] = None
+    excerpt: Optional[str] = None
 
 
 # SavedCollege Models (with status tracking)
@@ -480,6 +540,8 @@ class ToDo(BaseDBModel):
     description: Optional[str] = None
     due_date: Optional[datetime] = None
     status: str = "Not Started"  # Not Started, In Progress, Completed
+    completed: bool = False  # status == "Completed", stored for the (user_id, completed, due_date) index
+    has_due_date: bool = False  # sorts undated to-dos after dated ones (MongoDB sorts missing dates first)
     color_theme: str = "yellow"  # yellow, blue, green, pink, purple
     created_at: datetime = Field(default_factory=lambda: datetime.utcnow())
     updated_at: datetime = Field(default_factory=lambda: datetime.utcnow())
@@ -538,6 +600,7 @@ class Institution(BaseDBModel):
     level: Optional[str] = None  # "2-year", "4-year", etc.
     control: Optional[str] = None  # "Public", "Private nonprofit", "Private for-profit"
     website_url: Optional[str] = None
+    name_key: Optional[str] = None  # name_key(name), for anchored-prefix search
     created_at: datetime = Field(default_factory=lambda: datetime.utcnow())
     updated_at: datetime = Field(default_factory=lambda: datetime.utcnow())
 
@@ -560,6 +623,8 @@ class HighSchool(BaseDBModel):
     district: Optional[str] = None
     city: str
     state: str  # 2-letter code
+    zip: Optional[str] = None
+    name_key: Optional[str] = None  # name_key(name), for anchored-prefix search
     created_at: datetime = Field(default_factory=lambda: datetime.utcnow())
     updated_at: datetime = Field(default_factory=lambda: datetime.utcnow())
 
@@ -570,6 +635,7 @@ class HighSchoolCreate(BaseModel):
     district: Optional[str] = None
     city: str
     state: str
+    zip: Optional[str] = None
 
 
 # U.S. States Reference
@@ -643,6 +709,21 @@ def validate_address(street: str, city: str, state: str, zip_code: str) -> tuple
     return True, ""
 
 
+_NAME_KEY_APOSTROPHE_RE = re.compile(r"['\u2019]")
+_NAME_KEY_RE = re.compile(r"[^a-z0-9]+")
+
+
+def name_key(name: str) -> str:
+    """Normalized search key: lowercase ASCII words separated by single spaces
+
+    Apostrophes are dropped rather than split on, so "St. Mary's" and "st marys" match:
+    "St. Mary's Academy" -> "st marys academy"
+    """
+    name = _NAME_KEY_APOSTROPHE_RE.sub("", name or "")
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return " ".join(_NAME_KEY_RE.sub(" ", name.lower()).split())
+
+
 # Mega Menu Feature Tile Models
 class MegaMenuFeature(BaseDBModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -0,0 +1,189 @@
+"""
+Concurrency and rate limiting.
+
+ConcurrencyLimiter caps in-flight work with a bounded wait queue, so a spike
+degrades into fast 503s instead of occupying the event loop and upstream
+quota. TokenBucketLimiter throttles per key (user, session, IP) using either
+an in-process store or a MongoDB store shared by every worker.
+forwarded_client_ip() recovers the client address behind trusted proxies
+so per-IP limits don't lump every guest into the proxy's bucket.
+"""
+import asyncio
+import ipaddress
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple, Union
+
+from cachetools import TTLCache
+from pymongo import ReturnDocument
+
+
+class LimiterBusy(Exception):
+    """Raised when no slot frees up in time or the wait queue is full"""
+
+
+class RateLimited(Exception):
+    """Raised when a key has no tokens left"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limited, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """Semaphore with a bounded, time-limited wait queue (async context manager)"""
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float):
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self.rejected = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self.max_concurrent - self._semaphore._value
+
+    async def acquire(self) -> None:
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise LimiterBusy("Queue full")
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise LimiterBusy(f"No slot within {self.queue_timeout}s")
+        finally:
+            self.waiting -= 1
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
+
+
+class MemoryBucketStore:
+    """Token buckets held in this process"""
+
+    def __init__(self, maxsize: int = 100000, idle_ttl: int = 3600):
+        self._buckets: TTLCache = TTLCache(maxsize=maxsize, ttl=idle_ttl)
+
+    async def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        return allowed, tokens
+
+    async def refund(self, key: str, burst: int) -> None:
+        if key in self._buckets:
+            tokens, updated = self._buckets[key]
+            self._buckets[key] = (min(burst, tokens + 1), updated)
+
+
+class MongoBucketStore:
+    """Token buckets shared across workers; one atomic pipeline update per take"""
+
+    def __init__(self, collection, idle_ttl: int = 3600):
+        self.collection = collection
+        self.idle_ttl = idle_ttl
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index("expires_at", expireAfterSeconds=0)
+
+    async def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        now = datetime.utcnow()
+        elapsed_seconds = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        doc = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {
+                    "tokens": {"$min": [burst, {"$add": [
+                        {"$ifNull": ["$tokens", burst]},
+                        {"$multiply": [elapsed_seconds, rate]}
+                    ]}]},
+                    "updated_at": now,
+                    "expires_at": now + timedelta(seconds=self.idle_ttl),
+                }},
+                {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+                {"$set": {"tokens": {"$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]}}},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["allowed"], doc["tokens"]
+
+    async def refund(self, key: str, burst: int) -> None:
+        await self.collection.update_one(
+            {"_id": key},
+            [{"$set": {"tokens": {"$min": [burst, {"$add": ["$tokens", 1]}]}}}]
+        )
+
+
+class TokenBucketLimiter:
+    """Allows `burst` requests at once per key, refilling at `per_minute`"""
+
+    def __init__(self, per_minute: float, burst: int, store=None, prefix: str = ""):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.store = store or MemoryBucketStore()
+        self.prefix = prefix
+
+    async def check(self, key: Optional[str]) -> None:
+        if not key:
+            return
+        allowed, tokens = await self.store.take(f"{self.prefix}{key}", self.rate, self.burst)
+        if not allowed:
+            raise RateLimited(retry_after=(1 - tokens) / self.rate)
+
+    async def refund(self, key: Optional[str]) -> None:
+        """Give back the token a check() took, e.g. when a later limiter rejected the request"""
+        if key:
+            await self.store.refund(f"{self.prefix}{key}", self.burst)
+
+
+def parse_networks(spec: str) -> List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]:
+    """Comma-separated IPs/CIDRs -> networks (e.g. TRUSTED_PROXIES)"""
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in spec.split(",") if part.strip()]
+
+
+def _trusted(address: str, networks) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def forwarded_client_ip(peer: Optional[str], forwarded_for: Optional[str], trusted_networks) -> Optional[str]:
+    """Client address for rate limiting
+
+    X-Forwarded-For is only believed when the direct peer is a trusted proxy;
+    it is then read right to left, skipping further trusted hops, so a
+    client can't choose its own address by sending the header itself.
+    """
+    if not peer or not forwarded_for or not _trusted(peer, trusted_networks):
+        return peer
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _trusted(hop, trusted_networks):
+            return hop
+    return hops[0] if hops else peer
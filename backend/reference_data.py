@@ -0,0 +1,287 @@
+"""
+Institution and high-school reference data helpers.
+
+Typeahead matches an anchored prefix of name_key (see models.name_key), which
+MongoDB answers from the name_key / (state, name_key) / (zip, name_key)
+indexes instead of scanning with an unanchored case-insensitive regex.
+
+The bulk importer streams a CSV or NDJSON file (optionally gzipped; IPEDS
+HD and NCES CCD column names are recognized), dedupes rows on the natural
+key (ipeds_id / nces_id, else state + city + name), and upserts in batches
+with one batch in flight while the next is parsed. Lookup indexes used by
+the upserts are ensured first; search indexes are built after the load.
+
+    python reference_data.py backfill    # set name_key on existing records
+    python reference_data.py backfill --rebuild    # recompute every name_key after name_key() changes
+    python reference_data.py import high_schools ccd_schools.csv.gz --defer-indexes
+    python reference_data.py import institutions hd2023.csv
+"""
+import argparse
+import asyncio
+import csv
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from typing import Iterator, Optional
+from uuid import uuid4
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pydantic import ValidationError
+from pymongo import UpdateOne
+
+from models import InstitutionCreate, HighSchoolCreate, name_key, validate_state
+
+# Natural key id per collection; rows without one fall back to (state, city, name_key)
+NATURAL_KEYS = {"institutions": "ipeds_id", "high_schools": "nces_id"}
+
+CREATE_MODELS = {"institutions": InstitutionCreate, "high_schools": HighSchoolCreate}
+
+# Indexes the upserts look records up by; needed before a load
+LOOKUP_INDEXES = {
+    "institutions": [
+        ("ipeds_id", {"sparse": True}),
+        ([("state", 1), ("name_key", 1)], {}),
+    ],
+    "high_schools": [
+        ("nces_id", {"sparse": True}),
+        ([("state", 1), ("name_key", 1)], {}),
+    ],
+}
+
+# Typeahead-only indexes; with --defer-indexes these are dropped and rebuilt after a load
+SEARCH_INDEXES = {
+    "institutions": [
+        ("name_key", {}),
+    ],
+    "high_schools": [
+        ("name_key", {}),
+        ([("zip", 1), ("name_key", 1)], {}),
+    ],
+}
+
+# Lowercased source column -> model field (IPEDS HD, NCES CCD)
+COLUMN_ALIASES = {
+    "institutions": {
+        "unitid": "ipeds_id", "instnm": "name", "stabbr": "state",
+        "webaddr": "website_url", "website": "website_url",
+    },
+    "high_schools": {
+        "ncessch": "nces_id", "sch_name": "name", "lea_name": "district",
+        "lcity": "city", "lstate": "state", "lzip": "zip",
+    },
+}
+
+
+def prefix_search_query(q: str, state: Optional[str] = None, zip_code: Optional[str] = None) -> dict:
+    """Query for records whose name starts with q, optionally within a state and/or ZIP prefix"""
+    query = {}
+    key = name_key(q)
+    if key:
+        # name_key is [a-z0-9 ] only, so the pattern is a plain anchored prefix
+        # that MongoDB turns into tight index bounds
+        query["name_key"] = {"$regex": f"^{key}"}
+    if state:
+        query["state"] = state.upper()
+    if zip_code:
+        digits = re.sub(r"\D", "", zip_code)[:5]
+        if digits:
+            query["zip"] = digits if len(digits) == 5 else {"$regex": f"^{digits}"}
+    return query
+
+
+async def backfill_name_keys(collection, batch_size: int = 1000, rebuild: bool = False) -> int:
+    """Set name_key where it is missing, or with rebuild wherever it is out of date
+
+    Returns the number of records updated.
+    """
+    updated = 0
+    batch = []
+    # {"name_key": None} also matches missing fields and is served by the name_key index
+    query = {} if rebuild else {"name_key": None}
+    async for doc in collection.find(query, {"_id": 1, "name": 1, "name_key": 1}):
+        key = name_key(doc.get("name"))
+        if key == doc.get("name_key"):
+            continue
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"name_key": key}}))
+        if len(batch) >= batch_size:
+            result = await collection.bulk_write(batch, ordered=False)
+            updated += result.modified_count
+            batch = []
+    if batch:
+        result = await collection.bulk_write(batch, ordered=False)
+        updated += result.modified_count
+    return updated
+
+
+def read_rows(path: str, file_format: Optional[str] = None) -> Iterator[dict]:
+    """Stream rows from a CSV or NDJSON file (.gz is decompressed on the fly)"""
+    name = path[:-3] if path.endswith(".gz") else path
+    file_format = file_format or ("csv" if name.endswith(".csv") else "ndjson")
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8-sig", newline="") as f:
+        if file_format == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def to_record(kind: str, row: dict) -> Optional[dict]:
+    """Map a source row onto the reference model. Returns None for unusable rows"""
+    aliases = COLUMN_ALIASES[kind]
+    model = CREATE_MODELS[kind]
+    data = {}
+    for column, value in row.items():
+        if column is None or value in (None, ""):
+            continue
+        column = column.strip().lower()
+        field = aliases.get(column, column)
+        if field in model.model_fields and field not in data:
+            data[field] = str(value).strip()
+    try:
+        record = model.model_validate(data).model_dump(exclude_none=True)
+    except ValidationError:
+        return None
+    if not validate_state(record["state"]):
+        return None
+    record["state"] = record["state"].upper()
+    if record.get("zip"):
+        record["zip"] = re.sub(r"\D", "", record["zip"])[:5]
+    record["name_key"] = name_key(record["name"])
+    return record
+
+
+def natural_key_filter(kind: str, record: dict) -> dict:
+    key_field = NATURAL_KEYS[kind]
+    if record.get(key_field):
+        return {key_field: record[key_field]}
+    return {"state": record["state"], "name_key": record["name_key"], "city": record["city"]}
+
+
+def key_digest(key_filter: dict) -> bytes:
+    """Compact fingerprint of a natural key, so dedupe memory stays small on national files"""
+    return hashlib.blake2b(repr(sorted(key_filter.items())).encode("utf-8"), digest_size=8).digest()
+
+
+async def ensure_indexes(collection, indexes) -> None:
+    for keys, kwargs in indexes:
+        await collection.create_index(keys, **kwargs)
+
+
+async def drop_search_indexes(collection, kind: str) -> None:
+    existing = await collection.index_information()
+    for keys, _ in SEARCH_INDEXES[kind]:
+        spec = [(keys, 1)] if isinstance(keys, str) else keys
+        for index_name, info in existing.items():
+            if [tuple(k) for k in info["key"]] == [tuple(k) for k in spec]:
+                await collection.drop_index(index_name)
+
+
+async def import_reference_file(db, kind: str, path: str, file_format: Optional[str] = None,
+                                batch_size: int = 1000, defer_indexes: bool = False) -> dict:
+    """Upsert every usable row of the file into db[kind]. Returns load counts"""
+    collection = db[kind]
+    await ensure_indexes(collection, LOOKUP_INDEXES[kind])
+    if defer_indexes:
+        await drop_search_indexes(collection, kind)
+
+    counts = {"rows": 0, "skipped": 0, "duplicates": 0, "inserted": 0, "updated": 0}
+    seen = set()
+    batch = []
+    pending: Optional[asyncio.Task] = None
+
+    async def flush(operations):
+        result = await collection.bulk_write(operations, ordered=False)
+        counts["inserted"] += result.upserted_count
+        counts["updated"] += result.modified_count
+
+    try:
+        for row in read_rows(path, file_format):
+            counts["rows"] += 1
+            if counts["rows"] % 100000 == 0:
+                print(f"  {counts['rows']} rows read...")
+            record = to_record(kind, row)
+            if record is None:
+                counts["skipped"] += 1
+                continue
+            key_filter = natural_key_filter(kind, record)
+            key = key_digest(key_filter)
+            if key in seen:
+                # First occurrence wins
+                counts["duplicates"] += 1
+                continue
+            seen.add(key)
+
+            now = datetime.utcnow()
+            record["updated_at"] = now
+            batch.append(UpdateOne(
+                key_filter,
+                {"$set": record, "$setOnInsert": {"id": str(uuid4()), "created_at": now}},
+                upsert=True
+            ))
+            if len(batch) >= batch_size:
+                # Parse the next batch while this one is written
+                if pending:
+                    await pending
+                pending = asyncio.create_task(flush(batch))
+                batch = []
+
+        if pending:
+            await pending
+        if batch:
+            await flush(batch)
+    finally:
+        # A read or parse error leaves the last batch in flight; the upserts are
+        # idempotent, so it is cancelled and a re-run picks the rows up again
+        if pending and not pending.done():
+            pending.cancel()
+        if pending:
+            await asyncio.gather(pending, return_exceptions=True)
+
+    await ensure_indexes(collection, SEARCH_INDEXES[kind])
+    return counts
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Reference data maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    backfill = commands.add_parser("backfill", help="Set name_key on existing institutions and high schools")
+    backfill.add_argument("--rebuild", action="store_true",
+                          help="Recompute every name_key, not just missing ones")
+    load = commands.add_parser("import", help="Bulk import a CSV or NDJSON reference file")
+    load.add_argument("kind", choices=sorted(NATURAL_KEYS))
+    load.add_argument("path")
+    load.add_argument("--format", choices=["csv", "ndjson"], help="Default: from the file extension")
+    load.add_argument("--batch-size", type=int, default=1000)
+    load.add_argument("--defer-indexes", action="store_true",
+                      help="Drop typeahead indexes during the load and rebuild them after")
+    args = parser.parse_args()
+
+    # Connect to MongoDB
+    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[os.environ.get('DB_NAME', 'student_signal')]
+
+    if args.command == "backfill":
+        for collection in (db.institutions, db.high_schools):
+            updated = await backfill_name_keys(collection, rebuild=args.rebuild)
+            print(f"  {collection.name}: {updated} name keys set")
+        print("✅ Name key backfill complete!")
+    else:
+        counts = await import_reference_file(
+            db, args.kind, args.path, file_format=args.format,
+            batch_size=args.batch_size, defer_indexes=args.defer_indexes
+        )
+        print(f"  {counts['rows']} rows: {counts['inserted']} inserted, {counts['updated']} updated, "
+              f"{counts['duplicates']} duplicates, {counts['skipped']} skipped")
+        print(f"✅ {args.kind} import complete!")
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,341 @@
+"""
+In-memory suggestion index for search autocomplete.
+
+Names from colleges_ui, scholarships_ui and the majors vocabulary are split
+into word tokens and held in a sorted key array, so a prefix lookup is a
+bisect plus a short range scan (a flattened trie); a trigram index over
+the same tokens gives typo-tolerant matching ("standford", "univeristy").
+Results are ranked by popularity (saves and leads). The index is rebuilt in the background and
+swapped in atomically, so lookups never touch MongoDB.
+"""
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from models import name_key
+
+logger = logging.getLogger(__name__)
+
+MAJORS_VOCABULARY = [
+    "Psychology Programs", "Computer Science Degrees", "Pre-Nursing",
+    "Business Administration", "Engineering Programs", "Biology Degrees",
+    "English Literature", "Political Science", "Economics Programs",
+    "Pre-Med Track", "Education Degrees", "Communications Programs",
+    "Nursing Programs", "Mechanical Engineering", "Electrical Engineering",
+    "Data Science", "Mathematics Degrees", "Chemistry Programs",
+    "History Degrees", "Criminal Justice", "Marketing Programs",
+    "Finance Degrees", "Accounting Programs", "Graphic Design",
+    "Environmental Science", "Kinesiology", "Social Work", "Pre-Law Track",
+]
+
+# Short prefixes match thousands of names; their top results are precomputed
+PRECOMPUTED_PREFIX_LENGTH = 3
+SCAN_LIMIT = 5000
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(word: str) -> int:
+    """Typos tolerated for a query word: none below 4 letters, 2 from 8"""
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau (adjacent transposition) edit distance, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+@dataclass
+class Suggestion:
+    kind: str  # colleges, scholarships, majors
+    name: str
+    tokens: Tuple[str, ...]
+    popularity: float
+    payload: object
+    rank_key: Tuple = field(init=False)
+
+    def __post_init__(self):
+        # Most popular first, then shorter (closer) names, then alphabetical
+        self.rank_key = (-self.popularity, len(self.name), self.name)
+
+
+class SuggestionIndex:
+    """Immutable prefix and typo-tolerant index over suggestions; build a new one to refresh
+
+    Every distinct name token has a postings list of suggestions. Prefix
+    lookups bisect the sorted token list; fuzzy lookups take candidate tokens
+    sharing trigrams with the query word and verify them with a bounded edit
+    distance, so neither scans the whole vocabulary.
+    """
+
+    def __init__(self, suggestions: List[Suggestion]):
+        self.suggestions = suggestions
+        postings: Dict[str, Set[int]] = {}
+        for i, suggestion in enumerate(suggestions):
+            for token in suggestion.tokens:
+                postings.setdefault(token, set()).add(i)
+        self._postings = postings
+        self._tokens = sorted(postings)
+
+        self._grams: Dict[str, List[str]] = {}
+        for token in self._tokens:
+            for gram in trigrams(token):
+                self._grams.setdefault(gram, []).append(token)
+
+        self._top: Dict[Tuple[str, str], List[int]] = {}
+        groups: Dict[Tuple[str, str], Set[int]] = {}
+        for token, ids in postings.items():
+            for length in range(1, min(len(token), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                for i in ids:
+                    groups.setdefault((suggestions[i].kind, token[:length]), set()).add(i)
+        for key, ids in groups.items():
+            self._top[key] = sorted(ids, key=lambda i: suggestions[i].rank_key)[:10]
+
+    def _prefix_tokens(self, prefix: str) -> List[str]:
+        start = bisect_left(self._tokens, prefix)
+        tokens = []
+        for token in self._tokens[start:start + SCAN_LIMIT]:
+            if not token.startswith(prefix):
+                break
+            tokens.append(token)
+        return tokens
+
+    def _fuzzy_tokens(self, word: str) -> Dict[str, int]:
+        """Vocabulary tokens within max_edits(word) of word, with their distance"""
+        limit = max_edits(word)
+        if not limit:
+            return {}
+        grams = trigrams(word)
+        # Each edit destroys at most 3 trigrams, so closer tokens must share the rest
+        required = max(1, len(grams) - 3 * limit)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for token in self._grams.get(gram, ()):
+                shared[token] = shared.get(token, 0) + 1
+        matches = {}
+        for token, count in shared.items():
+            if count >= required and abs(len(token) - len(word)) <= limit:
+                distance = edit_distance(word, token, limit)
+                if distance <= limit:
+                    matches[token] = distance
+        return matches
+
+    def _word_matches(self, word: str, fuzzy: bool) -> Dict[str, int]:
+        """Tokens a query word matches: prefixes at distance 0, plus typos if fuzzy"""
+        matches = self._fuzzy_tokens(word) if fuzzy else {}
+        for token in self._prefix_tokens(word):
+            matches[token] = 0
+        return matches
+
+    def _match(self, words: List[str], kind: str, fuzzy: bool) -> List[Tuple[int, Suggestion]]:
+        per_word = [self._word_matches(w, fuzzy) for w in words]
+        # Drive the lookup from the most selective word, filter on the rest
+        anchor = min(per_word, key=lambda m: sum(len(self._postings[t]) for t in m))
+        ids = set()
+        for token in anchor:
+            ids |= self._postings[token]
+
+        results = []
+        for i in ids:
+            suggestion = self.suggestions[i]
+            if suggestion.kind != kind:
+                continue
+            edits = 0
+            for matches in per_word:
+                distances = [matches[t] for t in suggestion.tokens if t in matches]
+                if not distances:
+                    break
+                edits += min(distances)
+            else:
+                results.append((edits, suggestion))
+        results.sort(key=lambda r: (r[0], r[1].rank_key))
+        return results
+
+    def search(self, query: str, kind: str, limit: int = 5, fuzzy: bool = True) -> List[Suggestion]:
+        """Suggestions of one kind where every query word prefixes (or, with typos, matches) a name word
+
+        Exact prefix matches rank first; the fuzzy pass only runs when they
+        don't fill the limit.
+        """
+        words = name_key(query).split()
+        if not words:
+            return []
+
+        if len(words) == 1 and len(words[0]) <= PRECOMPUTED_PREFIX_LENGTH:
+            return [self.suggestions[i] for i in self._top.get((kind, words[0]), [])[:limit]]
+
+        results = self._match(words, kind, fuzzy=False)
+        if fuzzy and len(results) < limit:
+            results = self._match(words, kind, fuzzy=True)
+        return [suggestion for _, suggestion in results[:limit]]
+
+
+def college_suggestion(college: dict, popularity: float) -> Suggestion:
+    """Suggestion for a colleges_ui record; its IPEDS alias ("UCLA", "U of M") is matched like name words"""
+    location = ", ".join(p for p in (college.get("city"), college.get("state")) if p)
+    payload = {
+        "id": college.get("slug") or college.get("ipedsId"),
+        "name": college["name"],
+        "slug": college.get("slug"),
+        "ipedsId": college.get("ipedsId"),
+        "location": location,
+        "acceptance_rate": college.get("acceptanceRate"),
+        "image": college.get("imageUrl"),
+    }
+    tokens = tuple(name_key(f"{college['name']} {college.get('alias') or ''}").split())
+    return Suggestion("colleges", college["name"], tokens, popularity, payload)
+
+
+class AutocompleteService:
+    """Holds the current index and rebuilds it from MongoDB on demand or on a timer"""
+
+    def __init__(self, db, refresh_interval: float = 600, rebuild_delay: float = 10):
+        self.db = db
+        self.refresh_interval = refresh_interval
+        self.rebuild_delay = rebuild_delay
+        self.index: Optional[SuggestionIndex] = None
+        self.built_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Optional[asyncio.Task] = None
+
+    async def _popularity(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Save counts per college/scholarship plus lead counts per college"""
+        college_pop: Dict[str, int] = {}
+        scholarship_pop: Dict[str, int] = {}
+        for field_name, target in (("saved_colleges", college_pop), ("saved_scholarships", scholarship_pop)):
+            async for row in self.db.users.aggregate([
+                {"$project": {"_id": 0, "ids": f"${field_name}"}},
+                {"$unwind": "$ids"},
+                {"$group": {"_id": "$ids", "count": {"$sum": 1}}}
+            ]):
+                target[row["_id"]] = row["count"]
+        async for row in self.db.lead_rollups.aggregate([
+            {"$group": {"_id": "$college_id", "count": {"$sum": "$count"}}}
+        ]):
+            college_pop[row["_id"]] = college_pop.get(row["_id"], 0) + row["count"]
+        return college_pop, scholarship_pop
+
+    async def _source_aliases(self) -> Dict[str, str]:
+        """IPEDS aliases from the source colleges collection, by ipedsId
+
+        colleges_ui records transformed before the alias was carried over
+        don't have one; this fills the gap until the transform is re-run.
+        """
+        aliases = {}
+        async for c in self.db.colleges.find(
+            {"alias": {"$nin": [None, ""]}}, {"_id": 0, "ipedsId": 1, "alias": 1}
+        ):
+            aliases[c.get("ipedsId")] = c["alias"]
+        return aliases
+
+    async def load_suggestions(self) -> List[Suggestion]:
+        college_pop, scholarship_pop = await self._popularity()
+        aliases = await self._source_aliases()
+        suggestions = []
+
+        async for c in self.db.colleges_ui.find(
+            {"isActive": True},
+            {"_id": 0, "name": 1, "slug": 1, "ipedsId": 1, "city": 1, "state": 1,
+             "acceptanceRate": 1, "imageUrl": 1, "alias": 1}
+        ):
+            if not c.get("name"):
+                continue
+            if not c.get("alias"):
+                c["alias"] = aliases.get(c.get("ipedsId"))
+            suggestions.append(college_suggestion(c, college_pop.get(c.get("ipedsId"), 0)))
+
+        async for s in self.db.scholarships_ui.find(
+            {"isActive": True},
+            {"_id": 0, "id": 1, "slug": 1, "name": 1, "amount": 1, "amountMax": 1,
+             "deadlineDisplay": 1, "featured": 1}
+        ):
+            if not s.get("name"):
+                continue
+            payload = {
+                "id": s.get("id"),
+                "slug": s.get("slug"),
+                "name": s["name"],
+                "amount": s.get("amountMax") or s.get("amount"),
+                "deadline": s.get("deadlineDisplay"),
+            }
+            popularity = scholarship_pop.get(s.get("id"), 0) + (0.5 if s.get("featured") else 0)
+            suggestions.append(Suggestion("scholarships", s["name"], tuple(name_key(s["name"]).split()), popularity, payload))
+
+        for rank, major in enumerate(MAJORS_VOCABULARY):
+            # Vocabulary order is the editorial popularity order
+            suggestions.append(Suggestion("majors", major, tuple(name_key(major).split()), -rank, major))
+
+        return suggestions
+
+    async def rebuild(self) -> SuggestionIndex:
+        async with self._lock:
+            started = time.perf_counter()
+            suggestions = await self.load_suggestions()
+            index = SuggestionIndex(suggestions)
+            self.index = index
+            self.built_at = time.time()
+            logger.info(f"Autocomplete index built: {len(suggestions)} entries in {time.perf_counter() - started:.2f}s")
+            return index
+
+    async def get_index(self) -> SuggestionIndex:
+        if self.index is None:
+            return await self.rebuild()
+        return self.index
+
+    def request_rebuild(self, key=None) -> None:
+        """Rebuild shortly; a burst of catalog changes (e.g. an import) coalesces into one rebuild"""
+        if self._pending is None or self._pending.done():
+            self._pending = asyncio.create_task(self._delayed_rebuild())
+
+    async def _delayed_rebuild(self) -> None:
+        await asyncio.sleep(self.rebuild_delay)
+        await self._safe_rebuild()
+
+    async def _safe_rebuild(self) -> None:
+        try:
+            await self.rebuild()
+        except Exception as e:
+            logger.error(f"Autocomplete index rebuild failed: {e}")
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await self._safe_rebuild()
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        for task in (self._task, self._pending):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._pending = None
@@ -311,7 +311,7 @@ async def seed_database():
     print("Cleared existing data")
     
     # Add timestamps to all records
-    now = datetime.utcnow().isoformat()
+    now = datetime.utcnow()
     
     # Seed colleges
     for college in SAMPLE_COLLEGES:
@@ -7,6 +7,8 @@ import os
 from datetime import datetime
 from uuid import uuid4
 
+from models import name_key
+
 async def seed_reference_data():
     # Connect to MongoDB
     mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
@@ -124,6 +126,9 @@ async def seed_reference_data():
         }
     ]
     
+    for record in institutions + high_schools:
+        record["name_key"] = name_key(record["name"])
+    
     # Clear existing data
     await institutions_collection.delete_many({})
     await high_schools_collection.delete_many({})
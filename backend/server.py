@@ -1,11 +1,18 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Query, UploadFile, File
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Query, Request, UploadFile, File
 from fastapi.security import OAuth2PasswordRequestForm
+from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 import os
+import io
+import asyncio
+import csv
+import json
+import base64
 import logging
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
 from uuid import uuid4
 
@@ -28,7 +35,7 @@ from models import (
     Institution, InstitutionCreate,
     HighSchool, HighSchoolCreate,
     US_STATES, GPA_OPTIONS,
-    validate_state, validate_gpa, validate_date_string, validate_zip_code, validate_address,
+    validate_state, validate_gpa, validate_date_string, validate_zip_code, validate_address, name_key,
     MegaMenuFeature, MegaMenuFeatureCreate, MegaMenuFeatureUpdate,
     AnnouncementBar, AnnouncementBarCreate, AnnouncementBarUpdate
 )
@@ -38,12 +45,34 @@ from auth import (
 )
 from database import (
     db, colleges_collection, colleges_ui_collection, scholarships_collection, scholarships_ui_collection,
-    users_collection, ipeds_sync_collection, leads_collection, articles_collection, todos_collection,
+    users_collection, ipeds_sync_collection, leads_collection, lead_rollups_collection,
+    articles_collection, todos_collection,
     institutions_collection, high_schools_collection, mega_menu_features_collection,
-    announcement_bars_collection,
-    serialize_doc, prepare_for_mongo
+    announcement_bars_collection, rate_limits_collection, cache_versions_collection,
+    PROJECTION_PROFILES,
+    init_db, serialize_doc, prepare_for_mongo, as_utc
 )
 from ipeds import IPEDSIntegration
+from article_metadata import build_article_metadata
+from cache import (
+    ResponseCache, SnapshotCache, WriteThroughCache, CachedResponse, prepare_response, conditional_response
+)
+from lead_ingest import LeadWriter, IngestQueueFull
+from lead_rollups import record_leads, query_lead_rollups, daily_lead_totals, ensure_lead_rollups
+from chat_service import ElonChat, ChatTimeout, FAQAnswerCache, create_chat_backend, sse_event
+from search_index import AutocompleteService
+from announcements import CurrentAnnouncement
+from invalidation import InvalidationBus
+from badges import (
+    evaluate_badges, recompute_all_badges, PROFILE_UPDATED, ONBOARDING_COMPLETED,
+    COLLEGE_SAVED, COLLEGE_UNSAVED, COLLEGE_STATUS_CHANGED
+)
+from reference_data import prefix_search_query, backfill_name_keys
+from migrate_todos import migrate_todos
+from rate_limit import (
+    ConcurrencyLimiter, LimiterBusy, TokenBucketLimiter, RateLimited,
+    MemoryBucketStore, MongoBucketStore, forwarded_client_ip, parse_networks
+)
 
 
 ROOT_DIR = Path(__file__).parent
@@ -55,6 +84,30 @@ app = FastAPI(title="Student Signal API", version="1.0.0")
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+# In-process caches subscribe here; admin writes publish so every worker drops stale data
+cache_bus = InvalidationBus(
+    db,
+    cache_versions_collection,
+    mode=os.environ.get("CACHE_INVALIDATION_MODE", "auto"),
+    poll_interval=float(os.environ.get("CACHE_VERSION_POLL_SECONDS", "5"))
+)
+
+
+# ==================== Projection Helpers ====================
+
+PUBLIC_PROFILES = ("card", "detail")
+
+
+def resolve_projection(resource: str, fields: Optional[str], default: str, allowed=PUBLIC_PROFILES) -> dict:
+    """Resolve a named projection profile (card, detail, admin) for a resource"""
+    profile = (fields or default).strip().lower()
+    if profile not in allowed:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid fields profile '{profile}'. Use one of: {', '.join(allowed)}"
+        )
+    return PROJECTION_PROFILES[resource][profile]
+
 
 # ==================== Authentication Routes ====================
 
@@ -77,8 +130,8 @@ async def register(user_data: UserCreate):
     user_dict['saved_scholarships'] = []
     user_dict['onboarding_completed'] = False
     user_dict['badges'] = []
-    user_dict['created_at'] = datetime.utcnow().isoformat()
-    user_dict['updated_at'] = datetime.utcnow().isoformat()
+    user_dict['created_at'] = datetime.utcnow()
+    user_dict['updated_at'] = datetime.utcnow()
     
     # Generate unique ID
     import uuid
@@ -198,6 +251,7 @@ async def complete_onboarding(
     if result.modified_count == 0:
         raise HTTPException(status_code=404, detail="User not found or no changes made")
     
+    await evaluate_badges(users_collection, {"email": email}, ONBOARDING_COMPLETED)
     return {"message": "Onboarding completed successfully"}
 
 
@@ -220,18 +274,29 @@ async def get_colleges(
     max_act: Optional[int] = Query(None),
     sort_by: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
-    limit: int = Query(18, ge=1, le=100)
+    limit: int = Query(18, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Projection profile: card (default) or detail")
 ):
     """Get list of colleges with comprehensive filters - UI-optimized flat schema"""
+    projection = resolve_projection("colleges", fields, "card")
     query = {'isActive': True}  # Only return active colleges
     
-    # Search across name, city, and state
+    # Search across name, city, and state, plus name/alias word matches from the search index;
+    # typo-tolerant matches are only a fallback when nothing matches as typed (below)
+    search_index = None
+    search_conditions = []
     if search:
-        query['$or'] = [
+        search_conditions = [
             {'name': {'$regex': search, '$options': 'i'}},
             {'city': {'$regex': search, '$options': 'i'}},
             {'state': {'$regex': search, '$options': 'i'}}
         ]
+        search_index = await autocomplete.get_index()
+        exact_slugs = [
+            s.payload["slug"]
+            for s in search_index.search(search, "colleges", limit=FUZZY_SEARCH_LIMIT, fuzzy=False)
+        ]
+        query['$or'] = search_conditions + ([{'slug': {'$in': exact_slugs}}] if exact_slugs else [])
     
     # Location filters
     if state:
@@ -320,9 +385,16 @@ async def get_colleges(
     # Get total count
     total = await colleges_ui_collection.count_documents(query)
     
+    if search_index is not None and total == 0:
+        # Nothing matched as typed ("standford"): retry with typo-tolerant name matches
+        fuzzy_slugs = [s.payload["slug"] for s in search_index.search(search, "colleges", limit=FUZZY_SEARCH_LIMIT)]
+        if fuzzy_slugs:
+            query['$or'] = search_conditions + [{'slug': {'$in': fuzzy_slugs}}]
+            total = await colleges_ui_collection.count_documents(query)
+    
     # Get paginated results with sorting
     skip = (page - 1) * limit
-    colleges = await colleges_ui_collection.find(query, {"_id": 0}).sort(sort_field, sort_direction).skip(skip).limit(limit).to_list(limit)
+    colleges = await colleges_ui_collection.find(query, projection).sort(sort_field, sort_direction).skip(skip).limit(limit).to_list(limit)
     
     return {
         "colleges": colleges,
@@ -416,9 +488,12 @@ async def get_scholarships(
     min_amount: Optional[int] = Query(None),
     max_amount: Optional[int] = Query(None),
     page: int = Query(1, ge=1),
-    limit: int = Query(20, ge=1, le=100)
+    limit: int = Query(20, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Projection profile: card or detail (default)")
 ):
     """Get list of scholarships with filters - UI-optimized flat schema"""
+    # Defaults to detail because the catalog page renders description/eligibility
+    projection = resolve_projection("scholarships", fields, "detail")
     query = {'isActive': True}  # Only return active scholarships
     
     if search:
@@ -453,7 +528,7 @@ async def get_scholarships(
     
     # Get paginated results
     skip = (page - 1) * limit
-    scholarships = await scholarships_ui_collection.find(query, {"_id": 0}).skip(skip).limit(limit).to_list(limit)
+    scholarships = await scholarships_ui_collection.find(query, projection).skip(skip).limit(limit).to_list(limit)
     
     return {
         "scholarships": scholarships,
@@ -562,8 +637,9 @@ async def save_college(
     if college_id not in user.get('saved_colleges', []):
         await users_collection.update_one(
             {"email": email},
-            {"$push": {"saved_colleges": college_id}, "$set": {"updated_at": datetime.utcnow().isoformat()}}
+            {"$push": {"saved_colleges": college_id}, "$set": {"updated_at": datetime.utcnow()}}
         )
+        await evaluate_badges(users_collection, {"email": email}, COLLEGE_SAVED)
     
     return {"message": "College saved successfully"}
 
@@ -574,22 +650,28 @@ async def unsave_college(
     email: str = Depends(get_current_user_email)
 ):
     """Remove a college from user's saved list"""
-    await users_collection.update_one(
+    result = await users_collection.update_one(
         {"email": email},
-        {"$pull": {"saved_colleges": college_id}, "$set": {"updated_at": datetime.utcnow().isoformat()}}
+        {"$pull": {"saved_colleges": college_id}, "$set": {"updated_at": datetime.utcnow()}}
     )
+    if result.matched_count:
+        await evaluate_badges(users_collection, {"email": email}, COLLEGE_UNSAVED)
     return {"message": "College removed from saved list"}
 
 
-@api_router.get("/users/saved-colleges", response_model=List[CollegeUI])
-async def get_saved_colleges(email: str = Depends(get_current_user_email)):
+@api_router.get("/users/saved-colleges", response_model=List[CollegeUI], response_model_exclude_unset=True)
+async def get_saved_colleges(
+    fields: Optional[str] = Query(None, description="Projection profile: card (default) or detail"),
+    email: str = Depends(get_current_user_email)
+):
     """Get user's saved colleges - UI-optimized"""
-    user = await users_collection.find_one({"email": email})
+    projection = resolve_projection("colleges", fields, "card")
+    user = await users_collection.find_one({"email": email}, {"_id": 0, "saved_colleges": 1})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     saved_ids = user.get('saved_colleges', [])
-    colleges = await colleges_ui_collection.find({"ipedsId": {"$in": saved_ids}}, {"_id": 0}).to_list(100)
+    colleges = await colleges_ui_collection.find({"ipedsId": {"$in": saved_ids}}, projection).to_list(100)
     return colleges
 
 
@@ -603,16 +685,22 @@ async def save_scholarship(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    # Check if scholarship exists
-    scholarship = await scholarships_collection.find_one({"id": item.item_id})
+    # Check if scholarship exists (check by id or slug)
+    scholarship = await scholarships_ui_collection.find_one(
+        {"$or": [{"id": item.item_id}, {"slug": item.item_id}]},
+        {"_id": 0, "id": 1}
+    )
     if not scholarship:
         raise HTTPException(status_code=404, detail="Scholarship not found")
     
+    # Store id for consistency
+    scholarship_id = scholarship.get('id', item.item_id)
+    
     # Add to saved list if not already saved
-    if item.item_id not in user.get('saved_scholarships', []):
+    if scholarship_id not in user.get('saved_scholarships', []):
         await users_collection.update_one(
             {"email": email},
-            {"$push": {"saved_scholarships": item.item_id}, "$set": {"updated_at": datetime.utcnow().isoformat()}}
+            {"$push": {"saved_scholarships": scholarship_id}, "$set": {"updated_at": datetime.utcnow()}}
         )
     
     return {"message": "Scholarship saved successfully"}
@@ -626,21 +714,36 @@ async def unsave_scholarship(
     """Remove a scholarship from user's saved list"""
     await users_collection.update_one(
         {"email": email},
-        {"$pull": {"saved_scholarships": scholarship_id}, "$set": {"updated_at": datetime.utcnow().isoformat()}}
+        {"$pull": {"saved_scholarships": scholarship_id}, "$set": {"updated_at": datetime.utcnow()}}
     )
     return {"message": "Scholarship removed from saved list"}
 
 
-@api_router.get("/users/saved-scholarships", response_model=List[Scholarship])
-async def get_saved_scholarships(email: str = Depends(get_current_user_email)):
-    """Get user's saved scholarships"""
-    user = await users_collection.find_one({"email": email})
+@api_router.get("/users/saved-scholarships", response_model=List[ScholarshipUI], response_model_exclude_unset=True)
+async def get_saved_scholarships(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+    fields: Optional[str] = Query(None, description="Projection profile: card (default) or detail"),
+    email: str = Depends(get_current_user_email)
+):
+    """Get user's saved scholarships as lean cards, in saved order - UI-optimized"""
+    projection = resolve_projection("scholarships", fields, "card")
+    user = await users_collection.find_one({"email": email}, {"_id": 0, "saved_scholarships": 1})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    saved_ids = user.get('saved_scholarships', [])
-    scholarships = await scholarships_collection.find({"id": {"$in": saved_ids}}, {"_id": 0}).to_list(100)
-    return scholarships
+    # Paginate over the saved list itself so ordering is preserved
+    page_ids = user.get('saved_scholarships', [])[skip:skip + limit]
+    if not page_ids:
+        return []
+    
+    scholarships = await scholarships_ui_collection.find(
+        {"id": {"$in": page_ids}},
+        projection
+    ).to_list(len(page_ids))
+    
+    by_id = {s["id"]: s for s in scholarships}
+    return [by_id[sid] for sid in page_ids if sid in by_id]
 
 
 
@@ -663,48 +766,20 @@ async def update_profile(
         {"email": email},
         {"$set": update_data}
     )
+    # By id, since the update may have changed the email
+    await evaluate_badges(users_collection, {"_id": user["_id"]}, PROFILE_UPDATED)
     
     return {"message": "Profile updated successfully"}
 
 
 @api_router.get("/user/badges")
 async def get_user_badges(email: str = Depends(get_current_user_email)):
-    """Get user's earned badges"""
-    user = await users_collection.find_one({"email": email}, {"_id": 0})
+    """Get user's earned badges (kept up to date by the write routes, see badges.py)"""
+    user = await users_collection.find_one({"email": email}, {"_id": 0, "badges": 1})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    badges = []
-    
-    # Check "Profile Complete" badge
-    required_fields = ["first_name", "last_name", "email", "high_school_grad_year", "intended_major", "gpa"]
-    if all(user.get(field) for field in required_fields):
-        badges.append("Profile Complete")
-    
-    # Check "Photo Uploaded" badge
-    if user.get("profile_picture_url"):
-        badges.append("Photo Uploaded")
-    
-    # Check "First Application" badge
-    saved_colleges = user.get("saved_colleges", [])
-    if saved_colleges:
-        # Check if any college has status "Applied" or "Accepted"
-        colleges_with_status = await colleges_collection.find(
-            {"id": {"$in": saved_colleges}}, 
-            {"_id": 0}
-        ).to_list(100)
-        # For now, we'll award badge if user has saved any colleges
-        # TODO: Check actual status when we implement SavedCollegeItem structure
-        if len(saved_colleges) > 0:
-            badges.append("First Application")
-    
-    # Update user's badges in database
-    await users_collection.update_one(
-        {"email": email},
-        {"$set": {"badges": badges}}
-    )
-    
-    return {"badges": badges}
+    return {"badges": user.get("badges", [])}
 
 
 # ==================== College Status Routes ====================
@@ -734,6 +809,7 @@ async def update_college_status(
         {"email": email},
         {"$set": {"college_statuses": college_statuses, "updated_at": datetime.utcnow()}}
     )
+    await evaluate_badges(users_collection, {"email": email}, COLLEGE_STATUS_CHANGED)
     
     return {"message": "College status updated", "status": status_update.status}
 
@@ -756,15 +832,60 @@ async def get_college_status(
 
 # ==================== ToDo Routes ====================
 
+TODO_COMPLETED_STATUS = "Completed"
+TODO_VIEWS = ("all", "open", "overdue", "this_week", "completed")
+
+
+def build_todo_query(user_id: str, view: str, now: datetime) -> dict:
+    """Filter for one to-do view; every view is a prefix of the (user_id, completed, has_due_date, due_date) index"""
+    if view == "all":
+        return {"user_id": user_id}
+    if view == "completed":
+        return {"user_id": user_id, "completed": True}
+    
+    query = {"user_id": user_id, "completed": False}
+    if view == "overdue":
+        query["has_due_date"] = True
+        query["due_date"] = {"$lt": now}
+    elif view == "this_week":
+        # From the start of today to the end of Sunday (UTC)
+        today = datetime(now.year, now.month, now.day)
+        query["has_due_date"] = True
+        query["due_date"] = {"$gte": today, "$lt": today + timedelta(days=7 - today.weekday())}
+    return query
+
+
 @api_router.get("/todos")
-async def get_todos(email: str = Depends(get_current_user_email)):
-    """Get all todos for current user"""
-    user = await users_collection.find_one({"email": email})
+async def get_todos(
+    view: str = Query("all", description="all, open, overdue, this_week or completed"),
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=200),
+    email: str = Depends(get_current_user_email)
+):
+    """Get the current user's todos: open first, then by due date, undated last"""
+    if view not in TODO_VIEWS:
+        raise HTTPException(status_code=400, detail=f"Invalid view. Use one of: {', '.join(TODO_VIEWS)}")
+    
+    user = await users_collection.find_one({"email": email}, {"_id": 0, "id": 1})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    todos = await todos_collection.find({"user_id": user["id"]}, {"_id": 0}).to_list(1000)
-    return {"todos": todos}
+    query = build_todo_query(user["id"], view, datetime.utcnow())
+    # Served in index order; created_at keeps pages stable for equal due dates
+    sort = [("completed", 1), ("has_due_date", -1), ("due_date", 1), ("created_at", 1)]
+    
+    total = await todos_collection.count_documents(query)
+    
+    skip = (page - 1) * limit
+    todos = await todos_collection.find(query, {"_id": 0}).sort(sort).skip(skip).limit(limit).to_list(limit)
+    
+    return {
+        "todos": todos,
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "pages": (total + limit - 1) // limit
+    }
 
 
 @api_router.post("/todos", response_model=ToDo)
@@ -780,6 +901,8 @@ async def create_todo(
     todo_dict = todo_data.model_dump()
     todo_dict["id"] = str(uuid4())
     todo_dict["user_id"] = user["id"]
+    todo_dict["completed"] = todo_dict["status"] == TODO_COMPLETED_STATUS
+    todo_dict["has_due_date"] = todo_dict["due_date"] is not None
     todo_dict["created_at"] = datetime.utcnow()
     todo_dict["updated_at"] = datetime.utcnow()
     
@@ -804,6 +927,10 @@ async def update_todo(
         raise HTTPException(status_code=404, detail="Todo not found")
     
     update_data = {k: v for k, v in todo_data.model_dump().items() if v is not None}
+    if "status" in update_data:
+        update_data["completed"] = update_data["status"] == TODO_COMPLETED_STATUS
+    if "due_date" in update_data:
+        update_data["has_due_date"] = True
     update_data["updated_at"] = datetime.utcnow()
     
     await todos_collection.update_one(
@@ -837,20 +964,71 @@ async def delete_todo(
 
 # ==================== Reference Data Routes ====================
 
+# States and GPA options are constants: serialized once at import, cached by clients for a day
+STATES = [{"code": code, "name": name} for code, name in US_STATES.items()]
+GPA_OPTION_VALUES = [str(gpa) for gpa in GPA_OPTIONS]
+STATIC_REFERENCE_CACHE_CONTROL = "public, max-age=86400"
+STATES_RESPONSE = prepare_response({"states": STATES})
+GPA_OPTIONS_RESPONSE = prepare_response({"gpa_options": GPA_OPTION_VALUES})
+
+# The bundle also carries data-derived lists; versioned URLs (?v=) are immutable
+REFERENCE_BUNDLE_MAX_AGE = 300
+REFERENCE_BUNDLE_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
 @api_router.get("/reference/states")
-async def get_states():
+async def get_states(request: Request):
     """Get list of U.S. states"""
-    return {
-        "states": [{"code": code, "name": name} for code, name in US_STATES.items()]
-    }
+    return conditional_response(STATES_RESPONSE, request, STATIC_REFERENCE_CACHE_CONTROL)
 
 
 @api_router.get("/reference/gpa-options")
-async def get_gpa_options():
+async def get_gpa_options(request: Request):
     """Get list of valid GPA values"""
-    return {
-        "gpa_options": [str(gpa) for gpa in GPA_OPTIONS]
+    return conditional_response(GPA_OPTIONS_RESPONSE, request, STATIC_REFERENCE_CACHE_CONTROL)
+
+
+async def load_reference_bundle() -> Tuple[str, CachedResponse]:
+    """Everything the shared page chrome and forms need, serialized once. Returns (version, response)"""
+    degree_levels, scholarship_categories, article_categories, features = await asyncio.gather(
+        colleges_ui_collection.distinct("degreeLevel", {"isActive": True}),
+        scholarships_ui_collection.distinct("category", {"isActive": True}),
+        articles_collection.distinct("category", {"is_published": True}),
+        mega_menu_features_collection.find({"is_active": True}, {"_id": 0}).to_list(100)
+    )
+    payload = {
+        "states": STATES,
+        "gpa_options": GPA_OPTION_VALUES,
+        "degree_levels": sorted(d for d in degree_levels if d),
+        "categories": {
+            "scholarships": sorted(c for c in scholarship_categories if c),
+            "articles": sorted(c for c in article_categories if c)
+        },
+        "mega_menu": {f["menu_key"]: f for f in features}
     }
+    # Content hash, so clients can request the immutable ?v= URL
+    version = prepare_response(payload).etag.strip('"')[:16]
+    payload["version"] = version
+    return version, prepare_response(payload)
+
+
+reference_bundle = SnapshotCache(load_reference_bundle, ttl=600, max_stale=24 * 60 * 60)
+for collection_name in ("mega_menu_features", "articles", "colleges_ui", "scholarships_ui"):
+    cache_bus.subscribe(collection_name, lambda key: reference_bundle.invalidate())
+
+
+@api_router.get("/reference/bundle")
+async def get_reference_bundle(
+    request: Request,
+    v: Optional[str] = Query(None, description="Bundle version from a previous response; cached as immutable when current")
+):
+    """States, GPA options, degree levels, categories and active mega menu tiles in one response"""
+    version, entry = await reference_bundle.get()
+    if v == version:
+        cache_control = REFERENCE_BUNDLE_IMMUTABLE_CACHE_CONTROL
+    else:
+        cache_control = f"public, max-age={REFERENCE_BUNDLE_MAX_AGE}"
+    return conditional_response(entry, request, cache_control)
 
 
 @api_router.get("/reference/institutions")
@@ -859,15 +1037,9 @@ async def search_institutions(
     state: Optional[str] = Query(None, description="Filter by state"),
     limit: int = Query(20, le=100)
 ):
-    """Search institutions (colleges/universities)"""
-    query = {}
-    
-    if q:
-        query["name"] = {"$regex": q, "$options": "i"}
-    if state:
-        query["state"] = state.upper()
-    
-    institutions = await institutions_collection.find(query, {"_id": 0}).limit(limit).to_list(limit)
+    """Search institutions (colleges/universities) by name prefix"""
+    query = prefix_search_query(q, state=state)
+    institutions = await institutions_collection.find(query, {"_id": 0}).sort("name_key", 1).limit(limit).to_list(limit)
     return {"institutions": institutions}
 
 
@@ -884,6 +1056,7 @@ async def create_institution(
     institution_dict = institution_data.model_dump()
     institution_dict["id"] = str(uuid4())
     institution_dict["state"] = institution_data.state.upper()
+    institution_dict["name_key"] = name_key(institution_data.name)
     institution_dict["created_at"] = datetime.utcnow()
     institution_dict["updated_at"] = datetime.utcnow()
     
@@ -895,17 +1068,12 @@ async def create_institution(
 async def search_high_schools(
     q: str = Query("", description="Search query"),
     state: Optional[str] = Query(None, description="Filter by state"),
+    zip: Optional[str] = Query(None, description="Filter by ZIP code or ZIP prefix"),
     limit: int = Query(20, le=100)
 ):
-    """Search high schools"""
-    query = {}
-    
-    if q:
-        query["name"] = {"$regex": q, "$options": "i"}
-    if state:
-        query["state"] = state.upper()
-    
-    high_schools = await high_schools_collection.find(query, {"_id": 0}).limit(limit).to_list(limit)
+    """Search high schools by name prefix"""
+    query = prefix_search_query(q, state=state, zip_code=zip)
+    high_schools = await high_schools_collection.find(query, {"_id": 0}).sort("name_key", 1).limit(limit).to_list(limit)
     return {"high_schools": high_schools}
 
 
@@ -922,6 +1090,7 @@ async def create_high_school(
     high_school_dict = high_school_data.model_dump()
     high_school_dict["id"] = str(uuid4())
     high_school_dict["state"] = high_school_data.state.upper()
+    high_school_dict["name_key"] = name_key(high_school_data.name)
     high_school_dict["created_at"] = datetime.utcnow()
     high_school_dict["updated_at"] = datetime.utcnow()
     
@@ -931,42 +1100,51 @@ async def create_high_school(
 
 # ==================== Smart Search / Autocomplete Routes ====================
 
+# In-memory suggestion index over colleges_ui, scholarships_ui and majors;
+# built on startup and refreshed every SEARCH_INDEX_REFRESH_SECONDS
+autocomplete = AutocompleteService(db, refresh_interval=float(os.environ.get("SEARCH_INDEX_REFRESH_SECONDS", "600")))
+# Catalog changes are only seen with change streams (they come from import scripts)
+cache_bus.subscribe("colleges_ui", autocomplete.request_rebuild)
+cache_bus.subscribe("scholarships_ui", autocomplete.request_rebuild)
+# Cap on index matches added to a college list search
+FUZZY_SEARCH_LIMIT = 200
+
+
 @api_router.get("/search/autocomplete")
 async def search_autocomplete(q: str = Query("", min_length=1)):
     """Smart autocomplete search across colleges, scholarships, and majors"""
     if len(q) < 2:
         return {"colleges": [], "scholarships": [], "majors": []}
     
-    # Search colleges
-    colleges = await colleges_collection.find(
-        {"name": {"$regex": q, "$options": "i"}},
-        {"_id": 0, "name": 1, "location": 1, "acceptance_rate": 1, "image": 1, "id": 1}
-    ).limit(5).to_list(5)
-    
-    # Search scholarships
-    scholarships = await scholarships_collection.find(
-        {"name": {"$regex": q, "$options": "i"}},
-        {"_id": 0, "name": 1, "amount": 1, "deadline": 1, "id": 1}
-    ).limit(5).to_list(5)
-    
-    # Generate major suggestions (hardcoded for now, can be database later)
-    major_keywords = [
-        "Psychology Programs", "Computer Science Degrees", "Pre-Nursing",
-        "Business Administration", "Engineering Programs", "Biology Degrees",
-        "English Literature", "Political Science", "Economics Programs",
-        "Pre-Med Track", "Education Degrees", "Communications Programs"
-    ]
-    majors = [m for m in major_keywords if q.lower() in m.lower()][:5]
-    
+    index = await autocomplete.get_index()
     return {
-        "colleges": colleges,
-        "scholarships": scholarships,
-        "majors": majors
+        "colleges": [s.payload for s in index.search(q, "colleges")],
+        "scholarships": [s.payload for s in index.search(q, "scholarships")],
+        "majors": [s.payload for s in index.search(q, "majors")]
     }
 
 
+@api_router.post("/admin/search/reindex")
+async def reindex_search(email: str = Depends(get_current_admin_email)):
+    """Rebuild the autocomplete index now, e.g. after a catalog import (admin only)"""
+    index = await autocomplete.rebuild()
+    return {"message": "Search index rebuilt", "entries": len(index.suggestions)}
+
+
 # ==================== Lead Routes ====================
 
+# Batches lead inserts; started/stopped with the app
+lead_writer = LeadWriter(leads_collection)
+
+
+async def update_lead_rollups(leads: List[dict]):
+    """Keep per-college lead rollups current as batches are written"""
+    await record_leads(lead_rollups_collection, leads)
+
+
+lead_writer.on_flush(update_lead_rollups)
+
+
 @api_router.post("/leads", response_model=dict)
 async def create_lead(lead_data: LeadCreate):
     """Create a new lead (request info from college)"""
@@ -975,13 +1153,19 @@ async def create_lead(lead_data: LeadCreate):
         lead_dict = lead_data.dict()
         lead = Lead(**lead_dict)
         
-        # Insert into database
-        await leads_collection.insert_one(prepare_for_mongo(lead.dict()))
+        # Queue for the next batched insert; returns once the batch is written
+        await lead_writer.submit(prepare_for_mongo(lead.dict()))
         
         return {
             "message": "Lead submitted successfully",
             "lead_id": lead.id
         }
+    except IngestQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Lead intake is busy, please retry shortly",
+            headers={"Retry-After": "5"}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1002,38 +1186,152 @@ async def get_all_leads(
     return leads
 
 
-@api_router.get("/admin/leads/export")
-async def export_leads_csv(email: str = Depends(get_current_user_email)):
-    """Export all leads as CSV (admin only)"""
-    from fastapi.responses import StreamingResponse
-    import io
-    import csv
+# Fixed CSV column order for lead exports, independent of what any one document holds
+LEAD_EXPORT_FIELDS = list(Lead.model_fields.keys())
+LEAD_EXPORT_BATCH_SIZE = 1000
+# created_at is set before a lead is queued for the batched insert (and by several
+# workers), so leads can commit slightly out of created_at order. The CRM stream
+# only returns leads older than this, so a resume cursor never moves past a lead
+# that hasn't committed yet.
+LEAD_STREAM_SETTLE_SECONDS = float(os.environ.get("LEAD_STREAM_SETTLE_SECONDS", "60"))
+
+
+def build_lead_export_query(
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    college_id: Optional[str] = None
+) -> dict:
+    """Build the leads filter shared by the export endpoints"""
+    query = {}
+    if start_date or end_date:
+        query["created_at"] = {}
+        if start_date:
+            query["created_at"]["$gte"] = as_utc(start_date)
+        if end_date:
+            query["created_at"]["$lte"] = as_utc(end_date)
+    if college_id:
+        query["college_id"] = college_id
+    return query
+
+
+async def stream_leads_csv(query: dict):
+    """Yield a CSV export batch by batch straight from the cursor"""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=LEAD_EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
     
+    cursor = leads_collection.find(query, {"_id": 0}).sort("created_at", -1).batch_size(LEAD_EXPORT_BATCH_SIZE)
+    rows = 0
+    async for lead in cursor:
+        writer.writerow(lead)
+        rows += 1
+        if rows % LEAD_EXPORT_BATCH_SIZE == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+    
+    yield output.getvalue()
+
+
+@api_router.get("/admin/leads/export")
+async def export_leads_csv(
+    start_date: Optional[datetime] = Query(None, description="Only leads created at or after this time"),
+    end_date: Optional[datetime] = Query(None, description="Only leads created at or before this time"),
+    college_id: Optional[str] = Query(None),
+    email: str = Depends(get_current_user_email)
+):
+    """Export leads as a streamed CSV (admin only)"""
     # Check if user is admin
     user = await users_collection.find_one({"email": email})
     if not user or user.get('role') != 'admin':
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    # Fetch all leads
-    leads = await leads_collection.find({}, {"_id": 0}).sort("created_at", -1).to_list(10000)
-    
-    # Create CSV in memory
-    output = io.StringIO()
-    if leads:
-        fieldnames = list(leads[0].keys())
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(leads)
-    
-    output.seek(0)
+    query = build_lead_export_query(start_date, end_date, college_id)
     
     return StreamingResponse(
-        iter([output.getvalue()]),
+        stream_leads_csv(query),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=leads_export.csv"}
     )
 
 
+def encode_lead_cursor(lead: dict) -> str:
+    """Opaque resume token for the (created_at, id) position of a lead"""
+    position = json.dumps([jsonable_encoder(lead["created_at"]), lead["id"]])
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def decode_lead_cursor(cursor: str) -> dict:
+    """Turn a resume token into a filter for leads strictly after that position"""
+    try:
+        created_at, lead_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = as_utc(datetime.fromisoformat(created_at))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"$or": [
+        {"created_at": {"$gt": created_at}},
+        {"created_at": created_at, "id": {"$gt": lead_id}}
+    ]}
+
+
+async def stream_leads_ndjson(query: dict, limit: Optional[int]):
+    """Yield leads oldest first as NDJSON, with a checkpoint line after every batch"""
+    cursor = leads_collection.find(query, {"_id": 0}).sort([("created_at", 1), ("id", 1)]).batch_size(LEAD_EXPORT_BATCH_SIZE)
+    if limit:
+        cursor = cursor.limit(limit)
+    
+    lines = []
+    count = 0
+    last_lead = None
+    async for lead in cursor:
+        lines.append(json.dumps({"type": "lead", "data": jsonable_encoder(lead)}))
+        count += 1
+        last_lead = lead
+        if count % LEAD_EXPORT_BATCH_SIZE == 0:
+            lines.append(json.dumps({"type": "checkpoint", "cursor": encode_lead_cursor(lead), "count": count}))
+            yield "\n".join(lines) + "\n"
+            lines = []
+    
+    # Final checkpoint; has_more tells a limited sync to poll again straight away
+    lines.append(json.dumps({
+        "type": "checkpoint",
+        "cursor": encode_lead_cursor(last_lead) if last_lead else None,
+        "count": count,
+        "has_more": bool(limit) and count == limit,
+        "exported_at": datetime.utcnow().isoformat()
+    }))
+    yield "\n".join(lines) + "\n"
+
+
+@api_router.get("/admin/leads/stream")
+async def stream_leads_for_crm(
+    since: Optional[datetime] = Query(None, description="Only leads created after this time"),
+    cursor: Optional[str] = Query(None, description="Resume after the last checkpoint cursor received"),
+    college_id: Optional[str] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, description="Stop after this many leads"),
+    email: str = Depends(get_current_admin_email)
+):
+    """Stream leads as NDJSON for incremental CRM sync (admin only)
+    
+    Each line is either {"type": "lead", "data": {...}} or a
+    {"type": "checkpoint", "cursor": ...} line; pass the last cursor back to
+    resume. A cursor takes precedence over since. Leads from the last
+    LEAD_STREAM_SETTLE_SECONDS are held back until they can no longer be
+    overtaken by a lead committed late.
+    """
+    query = build_lead_export_query(college_id=college_id)
+    query["created_at"] = {"$lte": datetime.utcnow() - timedelta(seconds=LEAD_STREAM_SETTLE_SECONDS)}
+    if cursor:
+        query.update(decode_lead_cursor(cursor))
+    elif since:
+        query["created_at"]["$gt"] = as_utc(since)
+    
+    return StreamingResponse(
+        stream_leads_ndjson(query, limit),
+        media_type="application/x-ndjson"
+    )
+
+
 @api_router.get("/admin/leads/json")
 async def export_leads_json(email: str = Depends(get_current_user_email)):
     """Export all leads as JSON for CRM integration (admin only)"""
@@ -1054,28 +1352,8 @@ async def export_leads_json(email: str = Depends(get_current_user_email)):
 
 # ==================== Chat Routes (Elon AI) ====================
 
-@api_router.post("/chat", response_model=ChatResponse)
-async def chat_with_elon(
-    chat_message: ChatMessage,
-    email: str = Depends(get_current_user_email)
-):
-    """Chat with Elon AI assistant (authenticated users)"""
-    from emergentintegrations.llm.chat import LlmChat, UserMessage
-    from uuid import uuid4
-    
-    try:
-        # Get user info for personalization
-        user = await users_collection.find_one({"email": email}, {"_id": 0})
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        first_name = user.get('first_name', 'there')
-        
-        # Generate session ID if not provided
-        session_id = chat_message.session_id or str(uuid4())
-        
-        # Create system message with Student Signal context
-        system_message = f"""You are Elon, a friendly AI assistant for Student Signal, a college search and scholarship platform.
+# Create system message with Student Signal context
+USER_SYSTEM_PROMPT = """You are Elon, a friendly AI assistant for Student Signal, a college search and scholarship platform.
 
 User Context:
 - Name: {first_name}
@@ -1098,35 +1376,8 @@ Key Platform Features:
 
 Be conversational, supportive, and encouraging. Keep responses under 3-4 sentences unless more detail is specifically requested."""
 
-        # Initialize chat
-        chat = LlmChat(
-            api_key="sk-emergent-032766e07518853893",
-            session_id=session_id,
-            system_message=system_message
-        ).with_model("gemini", "gemini-2.0-flash")
-        
-        # Send message
-        user_message = UserMessage(text=chat_message.message)
-        response_text = await chat.send_message(user_message)
-        
-        return ChatResponse(response=response_text, session_id=session_id)
-        
-    except Exception as e:
-        print(f"Chat error: {str(e)}")
-        raise HTTPException(status_code=500, detail="Chat service temporarily unavailable")
-
-
-@api_router.post("/chat/guest", response_model=ChatResponse)
-async def chat_with_elon_guest(chat_message: ChatMessage):
-    """Limited chat for guest users (FAQ mode)"""
-    from emergentintegrations.llm.chat import LlmChat, UserMessage
-    from uuid import uuid4
-    
-    try:
-        session_id = chat_message.session_id or str(uuid4())
-        
-        # Limited system message for guests
-        system_message = """You are Elon, a helpful assistant for Student Signal.
+# Limited system message for guests
+GUEST_SYSTEM_PROMPT = """You are Elon, a helpful assistant for Student Signal.
 
 You're talking to a guest user (not logged in). Your role:
 1. Answer basic questions about Student Signal platform
@@ -1142,34 +1393,270 @@ Platform Overview:
 
 For detailed help, suggest they create a free account. Keep responses under 3 sentences."""
 
-        chat = LlmChat(
-            api_key="sk-emergent-032766e07518853893",
-            session_id=session_id,
-            system_message=system_message
-        ).with_model("gemini", "gemini-2.0-flash")
+# Bound in-flight model calls so chat spikes can't starve the rest of the API
+chat_concurrency = ConcurrencyLimiter(
+    max_concurrent=int(os.environ.get("CHAT_MAX_CONCURRENT", "32")),
+    max_queue=int(os.environ.get("CHAT_MAX_QUEUE", "128")),
+    queue_timeout=float(os.environ.get("CHAT_QUEUE_TIMEOUT_SECONDS", "10"))
+)
+
+# Chat model backend from CHAT_BACKEND (emergent, or stub for load tests)
+elon_chat = ElonChat(create_chat_backend(), limiter=chat_concurrency)
+
+# Per-key token buckets; CHAT_RATE_LIMIT_STORE=mongo shares them across workers
+chat_rate_store = (
+    MongoBucketStore(rate_limits_collection)
+    if os.environ.get("CHAT_RATE_LIMIT_STORE", "memory") == "mongo"
+    else MemoryBucketStore()
+)
+
+
+def chat_rate_limiter(name: str, per_minute: float, burst: int) -> Optional[TokenBucketLimiter]:
+    """Limiter for one chat key type; CHAT_RATE_<NAME>_PER_MINUTE / _BURST override, a rate of 0 disables it"""
+    per_minute = float(os.environ.get(f"CHAT_RATE_{name.upper()}_PER_MINUTE", per_minute))
+    if per_minute <= 0:
+        return None
+    burst = int(os.environ.get(f"CHAT_RATE_{name.upper()}_BURST", burst))
+    return TokenBucketLimiter(per_minute=per_minute, burst=burst, store=chat_rate_store, prefix=f"chat:{name}:")
+
+
+# Proxies whose X-Forwarded-For is believed (the ingress runs on the private network)
+TRUSTED_PROXIES = parse_networks(
+    os.environ.get("TRUSTED_PROXIES", "127.0.0.0/8,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16,::1/128")
+)
+
+user_chat_rate = chat_rate_limiter("user", per_minute=20, burst=5)
+guest_session_chat_rate = chat_rate_limiter("session", per_minute=10, burst=5)
+guest_ip_chat_rate = chat_rate_limiter("ip", per_minute=30, burst=10)
+
+
+async def enforce_chat_rate_limit(request: Request, email: Optional[str] = None, session_id: Optional[str] = None):
+    """Raise 429 when the user (or the guest's session/IP) is out of chat tokens"""
+    if email:
+        checks = [(user_chat_rate, email)]
+    else:
+        client_ip = forwarded_client_ip(
+            request.client.host if request.client else None,
+            request.headers.get("x-forwarded-for"),
+            TRUSTED_PROXIES
+        )
+        checks = [(guest_ip_chat_rate, client_ip), (guest_session_chat_rate, session_id)]
+    passed = []
+    try:
+        for limiter, key in checks:
+            if limiter:
+                await limiter.check(key)
+                passed.append((limiter, key))
+    except RateLimited as e:
+        # A rejected request shouldn't drain the buckets it already passed
+        for limiter, key in passed:
+            await limiter.refund(key)
+        raise HTTPException(
+            status_code=429,
+            detail="Too many chat messages, please slow down",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
+
+
+CHAT_BUSY_DETAIL = "Elon is helping a lot of students right now, please try again shortly"
+
+
+def chat_busy_error() -> HTTPException:
+    return HTTPException(status_code=503, detail=CHAT_BUSY_DETAIL, headers={"Retry-After": "5"})
+
+# Guest FAQ answers; the guest prompt is fixed, so a standalone question gets the same answer
+guest_faq_cache = FAQAnswerCache()
+
+
+def guest_first_turn(chat_message: ChatMessage) -> bool:
+    """True when the message opens a conversation, i.e. is a standalone question"""
+    return not elon_chat.has_session("guest", chat_message.session_id)
+
+
+def guest_faq_lookup(chat_message: ChatMessage, session_id: str) -> Optional[str]:
+    """Cached answer for a standalone guest question (no conversation context yet)
+
+    A hit starts the session with the cached exchange, so the model sees it on the next turn.
+    """
+    if not guest_first_turn(chat_message):
+        return None
+    if not guest_faq_cache.cacheable(chat_message.message):
+        return None
+    answer = guest_faq_cache.get(chat_message.message)
+    if answer is not None:
+        elon_chat.record_exchange("guest", session_id, chat_message.message, answer)
+    return answer
+
+
+def guest_faq_store(chat_message: ChatMessage, answer: str, first_turn: bool) -> None:
+    """Cache the answer to a standalone question; follow-ups depend on context other guests don't share"""
+    if first_turn and guest_faq_cache.cacheable(chat_message.message):
+        guest_faq_cache.set(chat_message.message, answer)
+
+
+async def user_system_prompt(email: str) -> str:
+    """Build the personalized system prompt for an authenticated user"""
+    # Get user info for personalization
+    user = await users_collection.find_one({"email": email}, {"_id": 0, "first_name": 1})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return USER_SYSTEM_PROMPT.format(first_name=user.get('first_name', 'there'))
+
+
+def stream_chat_reply(
+    mode: str,
+    session_id: str,
+    system_message: str,
+    text: str,
+    on_complete=None,
+    owner: Optional[str] = None
+) -> StreamingResponse:
+    """SSE response: one "token" event per chunk, then "done" (or "error")"""
+    async def events():
+        try:
+            chunks = []
+            async for chunk in elon_chat.stream(mode, session_id, system_message, text, owner=owner):
+                chunks.append(chunk)
+                yield sse_event({"token": chunk}, event="token")
+            if on_complete:
+                on_complete("".join(chunks))
+            yield sse_event({"session_id": session_id}, event="done")
+        except ChatTimeout:
+            yield sse_event({"detail": "Chat response timed out"}, event="error")
+        except LimiterBusy:
+            yield sse_event({"detail": CHAT_BUSY_DETAIL}, event="error")
+        except Exception as e:
+            print(f"Chat stream error: {str(e)}")
+            yield sse_event({"detail": "Chat service temporarily unavailable"}, event="error")
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@api_router.post("/chat", response_model=ChatResponse)
+async def chat_with_elon(
+    chat_message: ChatMessage,
+    request: Request,
+    email: str = Depends(get_current_user_email)
+):
+    """Chat with Elon AI assistant (authenticated users)"""
+    await enforce_chat_rate_limit(request, email=email)
+    try:
+        system_message = await user_system_prompt(email)
+        
+        # Generate session ID if not provided
+        session_id = chat_message.session_id or str(uuid4())
+        
+        response_text = await elon_chat.send("user", session_id, system_message, chat_message.message, owner=email)
+        
+        return ChatResponse(response=response_text, session_id=session_id)
+        
+    except HTTPException:
+        raise
+    except ChatTimeout:
+        raise HTTPException(status_code=504, detail="Chat response timed out")
+    except LimiterBusy:
+        raise chat_busy_error()
+    except Exception as e:
+        print(f"Chat error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Chat service temporarily unavailable")
+
+
+@api_router.post("/chat/stream")
+async def chat_with_elon_stream(
+    chat_message: ChatMessage,
+    request: Request,
+    email: str = Depends(get_current_user_email)
+):
+    """Chat with Elon as server-sent events (authenticated users)"""
+    await enforce_chat_rate_limit(request, email=email)
+    system_message = await user_system_prompt(email)
+    session_id = chat_message.session_id or str(uuid4())
+    return stream_chat_reply("user", session_id, system_message, chat_message.message, owner=email)
+
+
+@api_router.post("/chat/guest", response_model=ChatResponse)
+async def chat_with_elon_guest(chat_message: ChatMessage, request: Request):
+    """Limited chat for guest users (FAQ mode)"""
+    await enforce_chat_rate_limit(request, session_id=chat_message.session_id)
+    try:
+        session_id = chat_message.session_id or str(uuid4())
+        # Decided before the send, which registers the session
+        first_turn = guest_first_turn(chat_message)
+        
+        cached = guest_faq_lookup(chat_message, session_id)
+        if cached is not None:
+            return ChatResponse(response=cached, session_id=session_id)
         
-        user_message = UserMessage(text=chat_message.message)
-        response_text = await chat.send_message(user_message)
+        response_text = await elon_chat.send("guest", session_id, GUEST_SYSTEM_PROMPT, chat_message.message)
+        guest_faq_store(chat_message, response_text, first_turn)
         
         return ChatResponse(response=response_text, session_id=session_id)
         
+    except ChatTimeout:
+        raise HTTPException(status_code=504, detail="Chat response timed out")
+    except LimiterBusy:
+        raise chat_busy_error()
     except Exception as e:
         print(f"Guest chat error: {str(e)}")
         raise HTTPException(status_code=500, detail="Chat service temporarily unavailable")
 
 
+@api_router.post("/chat/guest/stream")
+async def chat_with_elon_guest_stream(chat_message: ChatMessage, request: Request):
+    """Guest chat as server-sent events (FAQ mode)"""
+    await enforce_chat_rate_limit(request, session_id=chat_message.session_id)
+    session_id = chat_message.session_id or str(uuid4())
+    first_turn = guest_first_turn(chat_message)
+    
+    cached = guest_faq_lookup(chat_message, session_id)
+    if cached is not None:
+        async def cached_events():
+            yield sse_event({"token": cached}, event="token")
+            yield sse_event({"session_id": session_id}, event="done")
+        return StreamingResponse(cached_events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+    
+    return stream_chat_reply(
+        "guest", session_id, GUEST_SYSTEM_PROMPT, chat_message.message,
+        on_complete=lambda answer: guest_faq_store(chat_message, answer, first_turn)
+    )
+
+
+@api_router.get("/admin/chat/stats")
+async def get_chat_stats(email: str = Depends(get_current_admin_email)):
+    """Chat concurrency and guest FAQ cache stats (admin only)"""
+    return {
+        "concurrency": chat_concurrency.stats(),
+        "faq_cache": guest_faq_cache.stats()
+    }
+
+
 
 
 # ==================== Mega Menu Feature Tiles Routes ====================
 
+async def load_mega_menu_features() -> dict:
+    """Active feature tile per menu_key"""
+    features = await mega_menu_features_collection.find({"is_active": True}, {"_id": 0}).to_list(100)
+    return {f["menu_key"]: f for f in features}
+
+
+async def load_mega_menu_feature(menu_key: str) -> Optional[dict]:
+    return await mega_menu_features_collection.find_one({"menu_key": menu_key, "is_active": True}, {"_id": 0})
+
+
+# menu_key -> active tile; the admin routes below publish their writes to it
+mega_menu_cache = WriteThroughCache("mega_menu_features", load_mega_menu_features, load_mega_menu_feature)
+cache_bus.subscribe("mega_menu_features", mega_menu_cache.on_change, key_field="menu_key")
+
+
 @api_router.get("/mega-menu/features/{menu_key}")
 async def get_mega_menu_feature(menu_key: str):
     """Get active feature tile for a specific menu"""
-    feature = await mega_menu_features_collection.find_one(
-        {"menu_key": menu_key, "is_active": True},
-        {"_id": 0}
-    )
-    return {"feature": feature}
+    return {"feature": await mega_menu_cache.get(menu_key)}
 
 
 @api_router.get("/admin/mega-menu/features")
@@ -1197,6 +1684,7 @@ async def create_mega_menu_feature(
     feature_dict["updated_at"] = datetime.utcnow()
     
     await mega_menu_features_collection.insert_one(feature_dict)
+    await cache_bus.publish("mega_menu_features", feature_data.menu_key)
     return feature_dict
 
 
@@ -1227,6 +1715,7 @@ async def update_mega_menu_feature(
     )
     
     updated_feature = await mega_menu_features_collection.find_one({"id": feature_id}, {"_id": 0})
+    await cache_bus.publish("mega_menu_features", feature["menu_key"])
     return updated_feature
 
 
@@ -1236,108 +1725,108 @@ async def delete_mega_menu_feature(
     email: str = Depends(get_current_admin_email)
 ):
     """Delete a mega menu feature tile (admin only)"""
-    result = await mega_menu_features_collection.delete_one({"id": feature_id})
-    if result.deleted_count == 0:
+    feature = await mega_menu_features_collection.find_one_and_delete({"id": feature_id}, {"_id": 0, "menu_key": 1})
+    if not feature:
         raise HTTPException(status_code=404, detail="Feature not found")
+    await cache_bus.publish("mega_menu_features", feature["menu_key"])
     return {"message": "Feature deleted successfully"}
 
 
 # ==================== Admin Analytics Routes ====================
 
+async def load_analytics_snapshot() -> dict:
+    """Compute dashboard stats with all queries in flight at once"""
+    today = datetime.utcnow().date()
+    days = [(today - timedelta(days=6-i)).isoformat() for i in range(7)]
+    
+    # Dashboard totals don't need to be exact; estimated counts read collection metadata
+    total_users, total_colleges, total_scholarships, total_leads, leads_by_date = await asyncio.gather(
+        users_collection.estimated_document_count(),
+        colleges_collection.estimated_document_count(),
+        scholarships_collection.estimated_document_count(),
+        leads_collection.estimated_document_count(),
+        # Leads over time (last 7 days) from the precomputed rollups
+        daily_lead_totals(lead_rollups_collection, days[0], days[-1])
+    )
+    
+    return {
+        "stats": {
+            "total_users": total_users,
+            "total_colleges": total_colleges,
+            "total_scholarships": total_scholarships,
+            "total_leads": total_leads
+        },
+        "leads_over_time": [{"date": day, "count": leads_by_date.get(day, 0)} for day in days],
+        "generated_at": datetime.utcnow().isoformat()
+    }
+
+
+# Served for 30s, then refreshed in the background while the stale copy is returned
+analytics_snapshot = SnapshotCache(load_analytics_snapshot, ttl=30, max_stale=300)
+
+
 @api_router.get("/admin/analytics")
 async def get_analytics(email: str = Depends(get_current_admin_email)):
     """Get admin analytics data"""
     try:
-        # Get total counts
-        total_users = await users_collection.count_documents({})
-        total_colleges = await colleges_collection.count_documents({})
-        total_scholarships = await scholarships_collection.count_documents({})
-        total_leads = await leads_collection.count_documents({})
-        
-        # Get leads over time (last 7 days)
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        
-        # Aggregate leads by date
-        leads_pipeline = [
-            {
-                "$match": {
-                    "created_at": {"$gte": seven_days_ago.isoformat()}
-                }
-            },
-            {
-                "$group": {
-                    "_id": {
-                        "$dateToString": {
-                            "format": "%Y-%m-%d",
-                            "date": {
-                                "$dateFromString": {
-                                    "dateString": "$created_at"
-                                }
-                            }
-                        }
-                    },
-                    "count": {"$sum": 1}
-                }
-            },
-            {
-                "$sort": {"_id": 1}
-            }
-        ]
-        
-        leads_by_date = await leads_collection.aggregate(leads_pipeline).to_list(None)
-        
-        # Fill in missing days with zero counts
-        leads_over_time = []
-        for i in range(7):
-            date = (datetime.utcnow() - timedelta(days=6-i)).strftime("%Y-%m-%d")
-            count = 0
-            for item in leads_by_date:
-                if item["_id"] == date:
-                    count = item["count"]
-                    break
-            leads_over_time.append({"date": date, "count": count})
-        
-        return {
-            "stats": {
-                "total_users": total_users,
-                "total_colleges": total_colleges,
-                "total_scholarships": total_scholarships,
-                "total_leads": total_leads
-            },
-            "leads_over_time": leads_over_time
-        }
+        return await analytics_snapshot.get()
         
     except Exception as e:
         print(f"Analytics error: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to load analytics data")
 
 
-# ==================== Public Articles Routes ====================
+@api_router.get("/admin/analytics/leads")
+async def get_lead_analytics(
+    start_date: Optional[str] = Query(None, description="First day (YYYY-MM-DD), default 30 days ago"),
+    end_date: Optional[str] = Query(None, description="Last day (YYYY-MM-DD), default today"),
+    college_id: Optional[str] = Query(None),
+    granularity: str = Query("day", pattern="^(day|week)$"),
+    email: str = Depends(get_current_admin_email)
+):
+    """Daily or weekly lead counts per college from the lead rollups (admin only)"""
+    today = datetime.utcnow().date()
+    for value in (start_date, end_date):
+        if value and not validate_date_string(value):
+            raise HTTPException(status_code=400, detail="Dates must be YYYY-MM-DD")
+    start_day = start_date[:10] if start_date else (today - timedelta(days=29)).isoformat()
+    end_day = end_date[:10] if end_date else today.isoformat()
+    
+    colleges = await query_lead_rollups(lead_rollups_collection, start_day, end_day, college_id, granularity)
+    
+    return {
+        "start_date": start_day,
+        "end_date": end_day,
+        "granularity": granularity,
+        "colleges": colleges,
+        "total": sum(c["total"] for c in colleges)
+    }
 
-def calculate_reading_time(text: str) -> int:
-    """Calculate estimated reading time in minutes (based on ~200 words per minute)"""
-    if not text:
-        return 1
-    word_count = len(text.split())
-    minutes = max(1, round(word_count / 200))
-    return minutes
 
+# ==================== Public Articles Routes ====================
 
-def enrich_article_with_reading_time(article: dict) -> dict:
-    """Add reading time to article if not already present"""
-    if article and "read_time_minutes" not in article:
-        article["read_time_minutes"] = calculate_reading_time(article.get("body", ""))
-    return article
+# Rendered public article responses; cleared by every admin article write
+articles_response_cache = ResponseCache(maxsize=512, ttl=300, max_age=60)
+cache_bus.subscribe("articles", lambda key: articles_response_cache.invalidate())
 
 
 @api_router.get("/articles", response_model=dict)
 async def get_articles(
+    request: Request,
     featured: bool = Query(False),
     is_video: bool = Query(False),
     category: Optional[str] = Query(None),
-    limit: int = Query(20)
+    limit: int = Query(20),
+    fields: Optional[str] = Query(None, description="Projection profile: card (default) or detail")
 ):
     """Get published articles with optional filtering"""
+    projection = resolve_projection("articles", fields, "card")
+    
+    cache_key = ("list", featured, is_video, category, limit, (fields or "card").strip().lower())
+    cached = articles_response_cache.get(cache_key)
+    if cached:
+        return articles_response_cache.respond(cached, request)
+    
     query = {"is_published": True}
     
     if featured:
@@ -1347,30 +1836,30 @@ async def get_articles(
     if category:
         query["category"] = category
     
-    articles = await articles_collection.find(query, {"_id": 0}).sort("published_at", -1).limit(limit).to_list(limit)
+    articles = await articles_collection.find(query, projection).sort("published_at", -1).limit(limit).to_list(limit)
     total = await articles_collection.count_documents(query)
     
-    # Add reading time to each article
-    for article in articles:
-        enrich_article_with_reading_time(article)
-    
-    return {
+    entry = articles_response_cache.set(cache_key, {
         "articles": articles,
         "total": total
-    }
+    })
+    return articles_response_cache.respond(entry, request)
 
 
 @api_router.get("/articles/{slug}", response_model=Article)
-async def get_article_by_slug(slug: str):
+async def get_article_by_slug(slug: str, request: Request):
     """Get single published article by slug"""
+    cache_key = ("slug", slug)
+    cached = articles_response_cache.get(cache_key)
+    if cached:
+        return articles_response_cache.respond(cached, request)
+    
     article = await articles_collection.find_one({"slug": slug, "is_published": True}, {"_id": 0})
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
-    # Add reading time calculation
-    enrich_article_with_reading_time(article)
-    
-    return article
+    entry = articles_response_cache.set(cache_key, Article.model_validate(article))
+    return articles_response_cache.respond(entry, request)
 
 
 # ==================== Admin Articles Routes ====================
@@ -1379,28 +1868,42 @@ async def get_article_by_slug(slug: str):
 async def get_all_articles_admin(
     email: str = Depends(get_current_admin_email),
     search: Optional[str] = Query(None),
-    category: Optional[str] = Query(None)
+    search_mode: str = Query("regex", pattern="^(regex|text)$", description="regex (substring) or text (text index, ranked)"),
+    category: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=200),
+    fields: Optional[str] = Query(None, description="Projection profile: card (default), detail or admin")
 ):
-    """Get all articles (admin only)"""
+    """Get articles for the CMS, paginated and newest first (admin only)"""
+    projection = dict(resolve_projection("articles", fields, "card", allowed=("card", "detail", "admin")))
     query = {}
-    
-    if search:
+    sort = [("created_at", -1)]
+    
+    if search and search_mode == "text":
+        # Uses the articles_text_search index; best matches first
+        query["$text"] = {"$search": search}
+        projection["score"] = {"$meta": "textScore"}
+        sort = [("score", {"$meta": "textScore"}), ("created_at", -1)]
+    elif search:
         query["$or"] = [
             {"title": {"$regex": search, "$options": "i"}},
-            {"summary": {"$regex": search, "$options": "i"}}
+            {"summary": {"$regex": search, "$options": "i"}},
+            {"category": {"$regex": search, "$options": "i"}}
         ]
     if category:
         query["category"] = category
     
-    articles = await articles_collection.find(query, {"_id": 0}).sort("created_at", -1).to_list(None)
+    total = await articles_collection.count_documents(query)
     
-    # Add reading time to each article
-    for article in articles:
-        enrich_article_with_reading_time(article)
+    skip = (page - 1) * limit
+    articles = await articles_collection.find(query, projection).sort(sort).skip(skip).limit(limit).to_list(limit)
     
     return {
         "articles": articles,
-        "total": len(articles)
+        "total": total,
+        "page": page,
+        "limit": limit,
+        "pages": (total + limit - 1) // limit
     }
 
 
@@ -1420,11 +1923,15 @@ async def create_article(
     article_dict['created_at'] = datetime.utcnow()
     article_dict['updated_at'] = datetime.utcnow()
     
+    # Reading time, word count and excerpt are stored once at write time
+    article_dict.update(build_article_metadata(article_dict['body']))
+    
     # Set published_at if not provided
     if article_dict.get('is_published') and not article_dict.get('published_at'):
         article_dict['published_at'] = datetime.utcnow()
     
     await articles_collection.insert_one(article_dict)
+    await cache_bus.publish("articles")
     
     return article_dict
 
@@ -1439,9 +1946,6 @@ async def get_article_admin(
     if not article:
         raise HTTPException(status_code=404, detail="Article not found")
     
-    # Add reading time
-    enrich_article_with_reading_time(article)
-    
     return article
 
 
@@ -1466,6 +1970,9 @@ async def update_article(
     if update_data:
         update_data['updated_at'] = datetime.utcnow()
         
+        if 'body' in update_data:
+            update_data.update(build_article_metadata(update_data['body']))
+        
         # Set published_at when publishing
         if update_data.get('is_published') and not existing_article.get('published_at'):
             update_data['published_at'] = datetime.utcnow()
@@ -1474,6 +1981,7 @@ async def update_article(
             {"id": article_id},
             {"$set": update_data}
         )
+        await cache_bus.publish("articles")
     
     updated_article = await articles_collection.find_one({"id": article_id}, {"_id": 0})
     return updated_article
@@ -1488,6 +1996,7 @@ async def delete_article(
     result = await articles_collection.delete_one({"id": article_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Article not found")
+    await cache_bus.publish("articles")
     
     return {"message": "Article deleted successfully", "id": article_id}
 
@@ -1544,6 +2053,12 @@ async def get_ipeds_status():
 
 # ==================== Announcement Bar Routes ====================
 
+# Current announcement served from memory; admin writes below publish to reload it
+current_announcement = CurrentAnnouncement(announcement_bars_collection)
+cache_bus.subscribe("announcement_bars", current_announcement.on_change)
+ANNOUNCEMENT_CACHE_CONTROL = "public, max-age=30"
+
+
 @api_router.post("/announcement/create")
 async def create_announcement(
     announcement_data: AnnouncementBarCreate,
@@ -1556,6 +2071,7 @@ async def create_announcement(
     announcement_dict['updated_at'] = datetime.utcnow()
     
     await announcement_bars_collection.insert_one(announcement_dict)
+    await cache_bus.publish("announcement_bars")
     
     # Return without _id
     announcement_dict.pop('_id', None)
@@ -1565,24 +2081,9 @@ async def create_announcement(
 
 
 @api_router.get("/announcement/current")
-async def get_current_announcement():
+async def get_current_announcement(request: Request):
     """Get the currently active announcement (public endpoint)"""
-    now = datetime.utcnow()
-    
-    announcement = await announcement_bars_collection.find_one(
-        {
-            "status": "active",
-            "start_date": {"$lte": now},
-            "end_date": {"$gte": now}
-        },
-        {"_id": 0},
-        sort=[("created_at", -1)]
-    )
-    
-    if not announcement:
-        return None
-    
-    return serialize_doc(announcement)
+    return conditional_response(current_announcement.response, request, ANNOUNCEMENT_CACHE_CONTROL)
 
 
 @api_router.get("/admin/announcements")
@@ -1617,6 +2118,7 @@ async def update_announcement(
         
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Announcement not found")
+        await cache_bus.publish("announcement_bars")
     
     updated_announcement = await announcement_bars_collection.find_one(
         {"id": announcement_id},
@@ -1638,6 +2140,7 @@ async def archive_announcement(
     
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Announcement not found")
+    await cache_bus.publish("announcement_bars")
     
     return {"message": "Announcement archived successfully", "id": announcement_id}
 
@@ -1659,6 +2162,45 @@ async def root():
 # Include the router in the main app
 app.include_router(api_router)
 
+
+@app.on_event("startup")
+async def startup():
+    await init_db()
+    # Records created before name_key existed; a no-op once backfilled
+    for collection in (institutions_collection, high_schools_collection):
+        await backfill_name_keys(collection)
+    # To-dos created before the stored completed/has_due_date flags; a no-op once migrated
+    await migrate_todos(db)
+    # Users not yet fully evaluated under the current badge rules: recent sign-ups,
+    # or everyone after a deploy that adds or changes a rule
+    changed = await recompute_all_badges(users_collection, stale_only=True)
+    if changed:
+        logger.info(f"Recomputed badges for {changed} users")
+    if isinstance(chat_rate_store, MongoBucketStore):
+        await chat_rate_store.ensure_indexes()
+    # First deploy: count existing leads before this worker starts adding to the rollups
+    counted = await ensure_lead_rollups(leads_collection, lead_rollups_collection)
+    if counted is not None:
+        logger.info(f"Built lead rollups from {counted} leads")
+    lead_writer.start()
+    autocomplete.start()
+    await current_announcement.start()
+    await cache_bus.start()
+    # Build the reference bundle before the first page load asks for it
+    try:
+        await reference_bundle.get()
+    except Exception as e:
+        logger.error(f"Reference bundle build failed: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await lead_writer.stop()
+    await autocomplete.stop()
+    await current_announcement.stop()
+    await cache_bus.stop()
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
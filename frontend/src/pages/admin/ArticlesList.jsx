@@ -4,21 +4,42 @@ import { Plus, Search, Edit, Trash2, Eye, FileText } from 'lucide-react';
 import { toast } from 'sonner';
 import api from '../../services/api';
 
+const PAGE_SIZE = 50;
+
 const ArticlesList = () => {
   const [articles, setArticles] = useState([]);
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
+  const [debouncedSearch, setDebouncedSearch] = useState('');
+  const [currentPage, setCurrentPage] = useState(1);
+  const [totalPages, setTotalPages] = useState(1);
+  const [totalArticles, setTotalArticles] = useState(0);
   const [deleteConfirm, setDeleteConfirm] = useState(null);
 
+  // Search runs on the server (the list is paginated), so wait for typing to pause
+  useEffect(() => {
+    const timer = setTimeout(() => {
+      setDebouncedSearch(searchTerm.trim());
+      setCurrentPage(1);
+    }, 300);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
   useEffect(() => {
     loadArticles();
-  }, []);
+  }, [currentPage, debouncedSearch]);
 
   const loadArticles = async () => {
     try {
       setLoading(true);
-      const response = await api.get('/api/admin/articles');
+      const params = { page: currentPage, limit: PAGE_SIZE };
+      if (debouncedSearch) {
+        params.search = debouncedSearch;
+      }
+      const response = await api.get('/api/admin/articles', { params });
       setArticles(response.data.articles || []);
+      setTotalPages(Math.max(1, response.data.pages || 1));
+      setTotalArticles(response.data.total || 0);
     } catch (error) {
       console.error('Failed to load articles:', error);
     } finally {
@@ -29,22 +50,26 @@ const ArticlesList = () => {
   const handleDelete = async (articleId) => {
     try {
       await api.delete(`/api/admin/articles/${articleId}`);
-      setArticles(articles.filter((a) => a.id !== articleId));
       setDeleteConfirm(null);
       toast.success('Article deleted successfully');
+      // Reload so the next article moves up into this page
+      if (articles.length === 1 && currentPage > 1) {
+        setCurrentPage(currentPage - 1);
+      } else {
+        loadArticles();
+      }
     } catch (error) {
       console.error('Failed to delete article:', error);
       toast.error('Failed to delete article. Please try again.');
     }
   };
 
-  const filteredArticles = articles.filter((article) =>
-    article.title.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    article.summary.toLowerCase().includes(searchTerm.toLowerCase()) ||
-    article.category.toLowerCase().includes(searchTerm.toLowerCase())
-  );
+  const handlePageChange = (newPage) => {
+    setCurrentPage(newPage);
+    window.scrollTo({ top: 0, behavior: 'smooth' });
+  };
 
-  if (loading) {
+  if (loading && articles.length === 0) {
     return (
       <div className="flex items-center justify-center h-64">
         <div className="text-gray-500">Loading articles...</div>
@@ -97,14 +122,14 @@ const ArticlesList = () => {
               </tr>
             </thead>
             <tbody className="divide-y divide-gray-200">
-              {filteredArticles.length === 0 ? (
+              {articles.length === 0 ? (
                 <tr>
                   <td colSpan={5} className="px-6 py-12 text-center text-gray-500">
                     No articles found
                   </td>
                 </tr>
               ) : (
-                filteredArticles.map((article) => (
+                articles.map((article) => (
                   <tr key={article.id} className="hover:bg-gray-50 transition-colors">
                     <td className="px-6 py-4">
                       <div className="flex items-start gap-3">
@@ -181,6 +206,31 @@ const ArticlesList = () => {
             </tbody>
           </table>
         </div>
+
+        {/* Pagination */}
+        {totalPages > 1 && (
+          <div className="flex items-center justify-between px-6 py-4 border-t border-gray-200">
+            <span className="text-sm text-gray-600">
+              Page {currentPage} of {totalPages} ({totalArticles} articles)
+            </span>
+            <div className="flex gap-2">
+              <button
+                onClick={() => handlePageChange(currentPage - 1)}
+                disabled={currentPage === 1 || loading}
+                className="px-4 py-2 border-2 border-gray-200 rounded-xl text-sm font-medium text-gray-700 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed transition-colors"
+              >
+                Previous
+              </button>
+              <button
+                onClick={() => handlePageChange(currentPage + 1)}
+                disabled={currentPage === totalPages || loading}
+                className="px-4 py-2 border-2 border-gray-200 rounded-xl text-sm font-medium text-gray-700 hover:bg-gray-50 disabled:opacity-50 disabled:cursor-not-allowed transition-colors"
+              >
+                Next
+              </button>
+            </div>
+          </div>
+        )}
       </div>
 
       {/* Delete Confirmation Modal */}
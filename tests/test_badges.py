@@ -0,0 +1,31 @@
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+from badges import BADGE_RULES_VERSION, recompute_all_badges
+
+
+def test_startup_recompute_only_touches_stale_users():
+    async def run():
+        users = AsyncMongoMockClient()["test"]["users"]
+        await users.insert_many([
+            # Saved a college before the badge rules existed
+            {"email": "old@example.com", "saved_colleges": ["reed"], "badges": []},
+            # Stamped with the current rules; left alone even though its badges look wrong
+            {"email": "current@example.com", "saved_colleges": ["bard"], "badges": [],
+             "badge_rules": BADGE_RULES_VERSION},
+            {"email": "stale@example.com", "profile_picture_url": "x.png", "badges": [],
+             "badge_rules": "older"},
+        ])
+        first = await recompute_all_badges(users, stale_only=True)
+        second = await recompute_all_badges(users, stale_only=True)
+        docs = {d["email"]: d async for d in users.find({})}
+        return first, second, docs
+
+    first, second, docs = asyncio.run(run())
+    assert first == 2
+    assert second == 0
+    assert docs["old@example.com"]["badges"] == ["First Application"]
+    assert docs["stale@example.com"]["badges"] == ["Photo Uploaded"]
+    assert docs["current@example.com"]["badges"] == []
+    assert {d["badge_rules"] for d in docs.values()} == {BADGE_RULES_VERSION}
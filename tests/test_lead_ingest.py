@@ -0,0 +1,50 @@
+import asyncio
+
+from lead_ingest import LeadWriter
+
+
+class SlowCollection:
+    """Collects inserted documents; each insert takes a little while"""
+
+    def __init__(self, delay: float = 0.01):
+        self.delay = delay
+        self.docs = []
+
+    async def insert_many(self, docs, ordered=True):
+        await asyncio.sleep(self.delay)
+        self.docs.extend(docs)
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+
+def test_stop_writes_every_submitted_lead():
+    async def run():
+        collection = SlowCollection()
+        writer = LeadWriter(collection, batch_size=10, flush_interval=1)
+        writer.start()
+        waiters = [asyncio.create_task(writer.submit({"n": i})) for i in range(3)]
+        # Let the writer take every lead off the queue into its current batch
+        await asyncio.sleep(0.1)
+        assert writer.pending == 0
+        await writer.stop()
+        await asyncio.wait_for(asyncio.gather(*waiters), timeout=1)
+        return collection, waiters
+
+    collection, waiters = asyncio.run(run())
+    assert sorted(doc["n"] for doc in collection.docs) == list(range(3))
+    assert all(w.done() and w.exception() is None for w in waiters)
+
+
+def test_stop_on_idle_writer_returns():
+    async def run():
+        collection = SlowCollection()
+        writer = LeadWriter(collection)
+        writer.start()
+        await asyncio.sleep(0)
+        await asyncio.wait_for(writer.stop(), timeout=1)
+        # Stopped writer writes straight through
+        await writer.submit({"n": 1})
+        return collection
+
+    assert asyncio.run(run()).docs == [{"n": 1}]
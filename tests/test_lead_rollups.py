@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime
+
+from mongomock_motor import AsyncMongoMockClient
+
+from lead_rollups import ensure_lead_rollups, rebuild_lead_rollups
+
+
+def lead(college_id, day, source="website"):
+    return {"college_id": college_id, "college_name": college_id.upper(), "source": source,
+            "created_at": datetime.fromisoformat(f"{day}T12:00:00")}
+
+
+class FailingLeads:
+    """Leads collection whose cursor breaks part-way through a rebuild"""
+
+    def __init__(self, leads):
+        self.leads = leads
+
+    def find(self, *args, **kwargs):
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def __aiter__(self):
+        yield self.leads[0]
+        raise RuntimeError("cursor lost")
+
+
+def test_rebuild_swaps_in_fresh_rollups():
+    async def run():
+        db = AsyncMongoMockClient()["test"]
+        await db.leads.insert_many([lead("a", "2026-01-01"), lead("a", "2026-01-01"), lead("b", "2026-01-02")])
+        # Stale bucket that no lead backs any more
+        await db.lead_rollups.insert_one({"day": "2025-12-31", "college_id": "z", "source": "website", "count": 9})
+
+        total = await rebuild_lead_rollups(db.leads, db.lead_rollups)
+        rows = await db.lead_rollups.find({}, {"_id": 0, "college_id": 1, "day": 1, "count": 1}).to_list(None)
+        names = await db.list_collection_names()
+        indexes = await db.lead_rollups.index_information()
+        return total, rows, names, indexes
+
+    total, rows, names, indexes = asyncio.run(run())
+    assert total == 3
+    assert sorted((r["college_id"], r["day"], r["count"]) for r in rows) == [
+        ("a", "2026-01-01", 2), ("b", "2026-01-02", 1)
+    ]
+    assert not [n for n in names if n.startswith("lead_rollups_rebuild")]
+    assert any(info.get("unique") for info in indexes.values())
+
+
+def test_failed_rebuild_keeps_existing_rollups():
+    async def run():
+        db = AsyncMongoMockClient()["test"]
+        await db.lead_rollups.insert_one({"day": "2026-01-01", "college_id": "a", "source": "website", "count": 5})
+        try:
+            await rebuild_lead_rollups(FailingLeads([lead("a", "2026-01-01")]), db.lead_rollups)
+        except RuntimeError:
+            pass
+        rows = await db.lead_rollups.find({}, {"_id": 0}).to_list(None)
+        return rows, await db.list_collection_names()
+
+    rows, names = asyncio.run(run())
+    assert [r["count"] for r in rows] == [5]
+    assert not [n for n in names if n.startswith("lead_rollups_rebuild")]
+
+
+def test_rollups_built_when_missing_and_left_alone_once_present():
+    async def run():
+        db = AsyncMongoMockClient()["test"]
+        assert await ensure_lead_rollups(db.leads, db.lead_rollups) is None
+        await db.leads.insert_many([lead("a", "2026-01-01"), lead("b", "2026-01-02")])
+        built = await ensure_lead_rollups(db.leads, db.lead_rollups)
+        again = await ensure_lead_rollups(db.leads, db.lead_rollups)
+        return built, again, await db.lead_rollups.count_documents({})
+
+    assert asyncio.run(run()) == (2, None, 2)
@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+
+from rate_limit import RateLimited, TokenBucketLimiter, forwarded_client_ip, parse_networks
+
+PROXIES = parse_networks("10.0.0.0/8")
+
+
+def test_forwarded_for_is_used_behind_a_trusted_proxy():
+    assert forwarded_client_ip("10.0.0.5", "203.0.113.7", PROXIES) == "203.0.113.7"
+    # Right-most untrusted hop wins; earlier hops are client-supplied
+    assert forwarded_client_ip("10.0.0.5", "1.2.3.4, 203.0.113.7, 10.0.0.9", PROXIES) == "203.0.113.7"
+
+
+def test_forwarded_for_is_ignored_from_untrusted_peers():
+    assert forwarded_client_ip("198.51.100.1", "203.0.113.7", PROXIES) == "198.51.100.1"
+    assert forwarded_client_ip("10.0.0.5", None, PROXIES) == "10.0.0.5"
+
+
+def test_refund_restores_a_token():
+    limiter = TokenBucketLimiter(per_minute=0.001, burst=1)
+
+    async def run():
+        await limiter.check("ip")
+        await limiter.refund("ip")
+        await limiter.check("ip")
+        with pytest.raises(RateLimited):
+            await limiter.check("ip")
+
+    asyncio.run(run())
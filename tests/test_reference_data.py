@@ -0,0 +1,133 @@
+import asyncio
+import json
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from models import name_key
+from reference_data import (
+    LOOKUP_INDEXES, SEARCH_INDEXES, backfill_name_keys, import_reference_file, prefix_search_query
+)
+
+
+def test_name_key_drops_apostrophes():
+    assert name_key("St. Mary's Academy") == "st marys academy"
+    assert name_key("St. Mary’s Academy") == "st marys academy"
+    assert name_key("Saint-Louis  High") == "saint louis high"
+
+
+def test_prefix_search_finds_apostrophe_names():
+    async def run():
+        collection = AsyncMongoMockClient()["test"]["high_schools"]
+        await collection.insert_one({"name": "St. Mary's Academy", "state": "CA",
+                                     "name_key": name_key("St. Mary's Academy")})
+        found = []
+        for q in ("st marys", "St. Mary's", "st mary"):
+            found.append(await collection.count_documents(prefix_search_query(q, state="ca")))
+        return found
+
+    assert asyncio.run(run()) == [1, 1, 1]
+
+
+def test_backfill_rebuild_rewrites_stale_keys():
+    async def run():
+        collection = AsyncMongoMockClient()["test"]["institutions"]
+        await collection.insert_many([
+            {"name": "St. Mary's College", "name_key": "st mary s college"},
+            {"name": "Reed College", "name_key": "reed college"},
+            {"name": "Bard College"},
+        ])
+        missing_only = await backfill_name_keys(collection)
+        rebuilt = await backfill_name_keys(collection, rebuild=True)
+        keys = sorted(d["name_key"] for d in await collection.find({}).to_list(None))
+        return missing_only, rebuilt, keys
+
+    missing_only, rebuilt, keys = asyncio.run(run())
+    assert missing_only == 1
+    assert rebuilt == 1
+    assert keys == ["bard college", "reed college", "st marys college"]
+
+
+INSTITUTIONS_CSV = (
+    "UNITID,INSTNM,CITY,STABBR\n"
+    "100,Reed College,Portland,OR\n"
+    "100,Reed College (duplicate),Portland,OR\n"
+    "200,Bard College,Annandale-On-Hudson,NY\n"
+    "300,Nowhere College,Nowhere,ZZ\n"
+    ",,Portland,OR\n"
+)
+
+
+def test_import_dedupes_and_skips_unusable_rows(tmp_path):
+    path = tmp_path / "hd.csv"
+    path.write_text(INSTITUTIONS_CSV)
+
+    async def run():
+        db = AsyncMongoMockClient()["test"]
+        counts = await import_reference_file(db, "institutions", str(path), batch_size=1)
+        names = sorted(d["name"] for d in await db.institutions.find({}).to_list(None))
+        return counts, names
+
+    counts, names = asyncio.run(run())
+    assert counts["rows"] == 5
+    assert counts["duplicates"] == 1
+    assert counts["skipped"] == 2
+    assert counts["inserted"] == 2
+    # First occurrence wins
+    assert names == ["Bard College", "Reed College"]
+
+
+def test_reimport_updates_records_in_place(tmp_path):
+    path = tmp_path / "ccd.ndjson"
+    path.write_text(
+        '{"ncessch": "A1", "sch_name": "Lincoln High", "lcity": "Portland", "lstate": "OR", "lzip": "97201-1234"}\n'
+        '{"sch_name": "St. Mary\'s Academy", "lcity": "Portland", "lstate": "OR"}\n'
+    )
+
+    async def run():
+        db = AsyncMongoMockClient()["test"]
+        first = await import_reference_file(db, "high_schools", str(path))
+        ids = sorted(d["id"] for d in await db.high_schools.find({}).to_list(None))
+        second = await import_reference_file(db, "high_schools", str(path))
+        docs = await db.high_schools.find({}).to_list(None)
+        return first, second, ids, docs
+
+    first, second, ids, docs = asyncio.run(run())
+    assert first["inserted"] == 2
+    assert second["inserted"] == 0
+    assert sorted(d["id"] for d in docs) == ids
+    assert {d["name_key"] for d in docs} == {"lincoln high", "st marys academy"}
+    assert {d.get("zip") for d in docs} == {"97201", None}
+
+
+def test_defer_indexes_rebuilds_search_indexes(tmp_path):
+    path = tmp_path / "hd.csv"
+    path.write_text(INSTITUTIONS_CSV)
+
+    async def run():
+        collection = AsyncMongoMockClient()["test"]["institutions"]
+        await collection.create_index("name_key", name="custom_name_key")
+        await import_reference_file(collection.database, "institutions", str(path), defer_indexes=True)
+        return [[tuple(k) for k in info["key"]] for info in (await collection.index_information()).values()]
+
+    keys = asyncio.run(run())
+    for index_keys, _ in SEARCH_INDEXES["institutions"] + LOOKUP_INDEXES["institutions"]:
+        spec = [(index_keys, 1)] if isinstance(index_keys, str) else index_keys
+        assert keys.count([tuple(k) for k in spec]) == 1
+
+
+def test_read_error_leaves_no_batch_in_flight(tmp_path):
+    path = tmp_path / "ccd.ndjson"
+    path.write_text(
+        '{"ncessch": "A1", "sch_name": "Lincoln High", "lcity": "Portland", "lstate": "OR"}\n'
+        '{"ncessch": "A2", "sch_name": "Grant High", "lcity": "Portland", "lstate": "OR"}\n'
+        '{"ncessch": "A3", "sch_name": "Benson\n'
+    )
+
+    async def run():
+        db = AsyncMongoMockClient()["test"]
+        with pytest.raises(json.JSONDecodeError):
+            await import_reference_file(db, "high_schools", str(path), batch_size=1)
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    assert asyncio.run(run()) == set()
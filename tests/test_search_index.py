@@ -0,0 +1,31 @@
+from search_index import SuggestionIndex, college_suggestion
+
+
+def build_index(colleges):
+    return SuggestionIndex([college_suggestion(c, popularity=0) for c in colleges])
+
+
+COLLEGES = [
+    {"name": "University of California-Los Angeles", "alias": "UCLA", "slug": "ucla", "ipedsId": "110662",
+     "city": "Los Angeles", "state": "CA"},
+    {"name": "University of California-Berkeley", "slug": "uc-berkeley", "ipedsId": "110635",
+     "city": "Berkeley", "state": "CA"},
+]
+
+
+def test_alias_query_returns_college():
+    index = build_index(COLLEGES)
+    results = index.search("UCLA", "colleges")
+    assert [s.payload["slug"] for s in results] == ["ucla"]
+    # Suggestions still show the official name
+    assert results[0].name == "University of California-Los Angeles"
+
+
+def test_alias_typo_returns_college():
+    index = build_index(COLLEGES)
+    assert [s.payload["slug"] for s in index.search("ucla los angles", "colleges")] == ["ucla"]
+
+
+def test_name_query_without_alias():
+    index = build_index(COLLEGES)
+    assert [s.payload["slug"] for s in index.search("berkeley", "colleges")] == ["uc-berkeley"]
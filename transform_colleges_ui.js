@@ -128,6 +128,7 @@ function transformCollege(college) {
   return {
     // Basic Info
     name: name,
+    alias: college.alias || null,
     slug: slug,
     city: college.location?.city || null,
     state: state,